@@ -1,7 +1,11 @@
 import streamlit as st
 import os
-from services.parser import extract_text
-from services.predictor import JobPredictor
+from services.analysis import AnalysisError, build_pipeline
+from services.intelligence_engine import IntelligenceEngine
+from services.model_registry import get_predictor
+
+# Local stages only: the app never pays for web discovery or job scraping
+APP_FIELDS = ["extracted_text", "role_predictions", "ats_score", "detected_skills"]
 
 # Page config
 st.set_page_config(
@@ -19,6 +23,11 @@ def load_css():
     else:
         st.warning("Custom CSS file not found.")
 
+@st.cache_resource
+def get_pipeline():
+    # Same stage DAG as the API (services/analysis.py)
+    return build_pipeline(get_predictor(), IntelligenceEngine())
+
 def main():
     load_css()
     
@@ -55,18 +64,17 @@ def main():
         file_ext = uploaded_file.name.split('.')[-1].lower()
 
         with st.status("Analyzing Resume...", expanded=True) as status:
-            st.write("Extracting data...")
-            resume_text = extract_text(uploaded_file, file_ext)
-            
-            if resume_text:
-                st.write("Running AI engine...")
-                predictor = JobPredictor()
-                results = predictor.predict(resume_text)
-                status.update(label="Analysis Complete", state="complete", expanded=False)
-            else:
+            st.write("Extracting data and running AI engine...")
+            try:
+                analysis = get_pipeline().compute_sync(
+                    {"contents": uploaded_file.getvalue(), "file_ext": file_ext}, APP_FIELDS)
+            except AnalysisError as e:
                 status.update(label="Error", state="error")
-                st.error("Text extraction failed.")
+                st.error(f"Text extraction failed. {e.message}")
                 return
+            resume_text = analysis["extracted_text"]
+            results = analysis["role_predictions"]
+            status.update(label="Analysis Complete", state="complete", expanded=False)
 
         if results:
             if results[0].get("role") == "Error":
@@ -90,6 +98,13 @@ def main():
                     """, unsafe_allow_html=True)
 
             st.markdown("<br><br>", unsafe_allow_html=True)
+
+            score_col, skills_col = st.columns([1, 3])
+            with score_col:
+                st.metric("ATS Score", f"{analysis['ats_score']}/100")
+            with skills_col:
+                st.markdown("**Detected Skills**")
+                st.write(", ".join(analysis["detected_skills"]) or "No known skills detected.")
             
             with st.expander("Detailed Analysis"):
                 st.dataframe(results, use_container_width=True)
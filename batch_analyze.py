@@ -0,0 +1,28 @@
+import argparse
+import json
+import sys
+from services.batch import iter_path_documents, run_batch
+from services.model_registry import get_predictor
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze many resumes and write one JSON result per line.")
+    parser.add_argument("paths", nargs="+", help="Resume files, directories or .zip archives")
+    parser.add_argument("-o", "--output", help="NDJSON output file (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("-k", "--top-k", type=int, default=3, help="Role predictions per resume")
+    args = parser.parse_args()
+
+    predictor = get_predictor()
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        count = 0
+        for result in run_batch(predictor, iter_path_documents(args.paths), workers=args.workers, top_k=args.top_k):
+            out.write(json.dumps(result) + "\n")
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"✅ Analyzed {count} resumes", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import io
+import random
+import textwrap
+
+from services.taxonomy import get_taxonomy
+
+# Pages of content per size class (roughly 45 lines per page)
+SIZES = {"short": 1, "medium": 3, "long": 10}
+LINES_PER_PAGE = 45
+
+FIRST_NAMES = ["Alex", "Maria", "Wei", "Priya", "Jonas", "Aisha", "Diego", "Yuki", "Olga", "Samuel"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Müller", "Okafor", "Silva", "Tanaka", "Ivanova", "Brown"]
+TITLES = ["Software Engineer", "Data Scientist", "DevOps Engineer", "Backend Developer", "Frontend Developer",
+          "Machine Learning Engineer", "Cloud Architect", "Product Manager", "QA Engineer", "Data Analyst"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Tech", "Hooli", "Vandelay"]
+VERBS = ["Built", "Led", "Designed", "Migrated", "Optimized", "Automated", "Shipped", "Maintained", "Scaled"]
+OBJECTS = ["a data pipeline", "the billing service", "CI/CD workflows", "a recommendation engine", "REST APIs",
+           "dashboards for executives", "the mobile app backend", "an internal ML platform", "monitoring and alerting"]
+OUTCOMES = ["cutting latency by 40%", "serving 2M users", "reducing costs by $120k/year", "with 99.95% uptime",
+            "for 12 enterprise clients", "in 3 months", "across 5 regions"]
+
+
+def resume_text(rng, size="medium"):
+    """Plain-text resume of roughly SIZES[size] pages, deterministic for an rng state."""
+    skills = sorted(get_taxonomy().skills)
+    target = SIZES[size] * LINES_PER_PAGE
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [
+        name,
+        f"{name.split()[0].lower()}@example.com | +1 555 {rng.randint(1000, 9999)} | github.com/{name.split()[1].lower()}",
+        "",
+        "SUMMARY",
+        f"{rng.choice(TITLES)} with {rng.randint(2, 15)} years of experience in "
+        f"{', '.join(rng.sample(skills, 4))}.",
+        "",
+        "EXPERIENCE",
+    ]
+    year = 2024
+    while len(lines) < target * 0.7:
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)} ({start} - {year})")
+        for _ in range(rng.randint(3, 6)):
+            lines.append(f"• {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(skills)} "
+                         f"and {rng.choice(skills)}, {rng.choice(OUTCOMES)}")
+        year = start
+    lines += ["", "PROJECTS"]
+    while len(lines) < target * 0.9:
+        lines.append(f"{rng.choice(['Open', 'Smart', 'Rapid', 'Deep'])}{rng.choice(['Bot', 'Lens', 'Flow', 'Graph'])}")
+        lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(skills)}")
+    lines += [
+        "", "EDUCATION", f"B.S. Computer Science, State University ({year - 4} - {year})",
+        "", "SKILLS", ", ".join(rng.sample(skills, min(15, len(skills)))),
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def to_docx(text, table=False):
+    """DOCX bytes: one paragraph per line, optionally the skills line as a table."""
+    import docx
+
+    document = docx.Document()
+    lines = text.split('\n')
+    for line in lines:
+        if table and ',' in line and line == lines[-2]:
+            cells = [s.strip() for s in line.split(',')]
+            grid = document.add_table(rows=(len(cells) + 2) // 3, cols=3)
+            for i, cell in enumerate(cells):
+                grid.cell(i // 3, i % 3).text = cell
+        else:
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _pdf_string(line):
+    # WinAnsi (cp1252) bytes inside a PDF literal string
+    data = line.encode('cp1252', 'replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def to_pdf(text, columns=1):
+    """
+    Minimal text-layer PDF (Helvetica, Letter pages) without extra
+    dependencies. columns=2 flows lines into two side-by-side columns,
+    the layout that triggers the layout-aware extraction backend.
+    """
+    max_chars = 95 if columns == 1 else 48
+    lines = [wrapped for line in text.split('\n') for wrapped in (textwrap.wrap(line, max_chars) or [""])]
+    per_column = LINES_PER_PAGE
+    per_page = per_column * columns
+    x_positions = [50] if columns == 1 else [40, 316]
+
+    pages = []
+    for start in range(0, len(lines), per_page):
+        ops = [b"BT /F1 10 Tf"]
+        for i, line in enumerate(lines[start:start + per_page]):
+            column, row = divmod(i, per_column)
+            y = 750 - row * 15
+            ops.append(b"1 0 0 1 %d %d Tm (" % (x_positions[column], y) + _pdf_string(line) + b") Tj")
+        ops.append(b"ET")
+        pages.append(b"\n".join(ops))
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for content in pages:
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects)))
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids) + b"] /Count %d >>" % len(kids)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def build_corpus(per_variant=3, seed=0):
+    """
+    Deterministic list of {"name", "type", "layout", "size", "text", "data"}
+    covering every size with TXT, DOCX (plain / with table) and PDF
+    (one / two columns) variants.
+    """
+    rng = random.Random(seed)
+    variants = [("txt", "plain"), ("docx", "plain"), ("docx", "table"), ("pdf", "single"), ("pdf", "two-column")]
+    corpus = []
+    for size in SIZES:
+        for file_type, layout in variants:
+            for i in range(per_variant):
+                text = resume_text(rng, size)
+                if file_type == "txt":
+                    data = text.encode('utf-8')
+                elif file_type == "docx":
+                    data = to_docx(text, table=layout == "table")
+                else:
+                    data = to_pdf(text, columns=2 if layout == "two-column" else 1)
+                corpus.append({
+                    "name": f"{size}-{layout}-{i}.{file_type}",
+                    "type": file_type,
+                    "layout": layout,
+                    "size": size,
+                    "text": text,
+                    "data": data,
+                })
+    return corpus
@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+from benchmarks.corpus import build_corpus
+
+# p50 / peak memory growth above baseline * (1 + tolerance) is a regression
+DEFAULT_TOLERANCE = 0.25
+# ... unless it is within timer / scheduler noise
+MIN_DELTA = {"p50_ms": 0.5, "peak_kib": 64}
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED = 0
+
+# Run in a fresh interpreter: seconds to import the API and peak RSS (KiB)
+COLD_START_SCRIPT = ("import resource, time; started = time.perf_counter(); import main; "
+                     "print(time.perf_counter() - started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)")
+
+FAKE_ROLES_BODY = ("Popular paths: Data Scientist, Machine Learning Engineer, Backend Developer "
+                   "and DevOps Engineer roles are in demand.")
+
+
+class FakeDDGS:
+    """Local stand-in for duckduckgo_search.DDGS with a fixed latency."""
+
+    latency = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query, max_results=5):
+        time.sleep(self.latency)
+        return [{"title": query, "body": FAKE_ROLES_BODY}] * max_results
+
+
+def fake_scrape(latency):
+    def scrape(query):
+        time.sleep(latency)
+        return [{"title": query, "company": "Example Co", "url": "#", "platform": "Fake"}] * 5
+    return scrape
+
+
+def summarize(durations):
+    """Latency percentiles (ms) and throughput of a list of call durations (s)."""
+    ms = np.array(durations) * 1000
+    return {
+        "n": len(durations),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p90_ms": round(float(np.percentile(ms, 90)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "throughput_per_s": round(len(durations) / (ms.sum() / 1000), 2) if ms.sum() else None,
+    }
+
+
+def measure(func, inputs, repeats):
+    """
+    Times func over every input (after one warm-up call), then runs each
+    input once more under tracemalloc for the peak allocation.
+    """
+    func(inputs[0])
+    durations = []
+    for _ in range(repeats):
+        for item in inputs:
+            started = time.perf_counter()
+            func(item)
+            durations.append(time.perf_counter() - started)
+    stats = summarize(durations)
+
+    peak = 0
+    tracemalloc.start()
+    for item in inputs:
+        tracemalloc.reset_peak()
+        func(item)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    stats["peak_kib"] = round(peak / 1024, 1)
+    return stats
+
+
+def bench_stages(corpus, repeats):
+    """Each local analysis stage in isolation."""
+    from services.cleaner import clean_text
+    from services.document import ResumeDocument
+    from services.intelligence_engine import IntelligenceEngine
+    from services.model_registry import get_predictor
+    from services.parser import extract_text_report_from_bytes, load_backends
+    from services.skill_extractor import extract_skills
+
+    # As after the server warm-up: no first-use imports inside the timings
+    load_backends()
+    predictor = get_predictor()
+    intelligence = IntelligenceEngine(search_client=FakeDDGS)
+    # Fresh str copies so no stage sees another stage's cached document
+    texts = [item["text"] for item in corpus]
+
+    results = {}
+    for file_type in ("txt", "docx", "pdf"):
+        files = [item for item in corpus if item["type"] == file_type]
+        results[f"extract_text.{file_type}"] = measure(
+            lambda item: extract_text_report_from_bytes(item["data"], item["type"]), files, repeats)
+    results["clean_text"] = measure(clean_text, texts, repeats)
+    results["extract_skills"] = measure(extract_skills, texts, repeats)
+    results["predict"] = measure(predictor.predict, texts, repeats)
+    # Ranked from the document the pipeline already built (skills and cleaned text cached)
+    documents = [ResumeDocument(text) for text in texts]
+    for document in documents:
+        document.skills, document.clean
+    results["rank_roles"] = measure(predictor.rank_roles, documents, repeats)
+    results["calculate_ats_score"] = measure(predictor.calculate_ats_score, texts, repeats)
+    results["analyze_context"] = measure(intelligence.analyze_context, texts, repeats)
+    return results
+
+
+def bench_cold_start(repeats):
+    """
+    `import main` in fresh interpreters: what a new worker pays before it
+    can bind its port. peak_kib is the process's peak RSS.
+    """
+    durations = []
+    peak = 0
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-W", "ignore", "-c", COLD_START_SCRIPT], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True).stdout.split()
+        durations.append(float(output[-2]))
+        peak = max(peak, int(output[-1]))
+    stats = summarize(durations)
+    stats["peak_kib"] = peak
+    return {"import_main": stats}
+
+
+def bench_analyze(corpus, repeats, network_latency):
+    """
+    End-to-end POST /analyze through the ASGI app, with the web search and
+    job boards replaced by local fakes. Cold requests get an empty result
+    cache; the cached stage re-sends an upload that was just analyzed.
+    """
+    from fastapi.testclient import TestClient
+    import main
+    from services.outbound import Provider
+    from services.result_cache import ResultCache
+
+    FakeDDGS.latency = network_latency
+    main.intelligence.search_client = FakeDDGS
+    main.SCRAPING_AVAILABLE = True
+    main.job_worker.scrape = fake_scrape(network_latency)
+    # The fakes are local: no rate limit on their calls
+    main.intelligence.search_provider = Provider("duckduckgo", rate=1e9, burst=10 ** 9)
+    main.job_worker.provider = Provider("job_boards", rate=1e9, burst=10 ** 9)
+
+    def post(client, item, cache):
+        response = client.post("/analyze", files={"file": (item["name"], item["data"])})
+        if response.status_code != 200:
+            raise RuntimeError(f"/analyze failed for {item['name']}: {response.status_code} {response.text[:200]}")
+        if response.headers.get("X-Cache") != cache:
+            raise RuntimeError(f"/analyze for {item['name']} was a cache {response.headers.get('X-Cache')}")
+
+    results = {}
+    with TestClient(main.app) as client:
+        def cold(item):
+            main.result_cache = ResultCache(max_entries=8)
+            main.intelligence.web_cache.clear()
+            post(client, item, "miss")
+
+        results["analyze"] = measure(cold, corpus, repeats)
+
+        main.result_cache = ResultCache(max_entries=len(corpus))
+        for item in corpus:
+            post(client, item, "miss")
+        results["analyze_cached"] = measure(lambda item: post(client, item, "hit"), corpus, repeats)
+    return results
+
+
+def run(quick=False, network_latency=0.0):
+    per_variant, repeats = (1, 1) if quick else (3, 3)
+    corpus = build_corpus(per_variant=per_variant, seed=SEED)
+    started = time.perf_counter()
+    stages = bench_cold_start(repeats * 3)
+    stages.update(bench_stages(corpus, repeats))
+    stages.update(bench_analyze(corpus, repeats, network_latency))
+    return {
+        "meta": {
+            "mode": "quick" if quick else "full",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": SEED,
+            "documents": len(corpus),
+            "repeats": repeats,
+            "network_latency_s": network_latency,
+            "seconds": round(time.perf_counter() - started, 1),
+        },
+        "stages": stages,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Stage-by-stage p50 latency and peak memory against a stored baseline.
+    Returns a list of regression messages (empty when within tolerance).
+    """
+    regressions = []
+    for stage, old in baseline["stages"].items():
+        new = results["stages"].get(stage)
+        if new is None:
+            continue
+        for field in ("p50_ms", "peak_kib"):
+            if not old.get(field) or new[field] - old[field] < MIN_DELTA[field]:
+                continue
+            if new[field] > old[field] * (1 + tolerance):
+                regressions.append(f"{stage} {field}: {old[field]} -> {new[field]} "
+                                   f"(+{(new[field] / old[field] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_report(results, baseline=None):
+    print(f"{'stage':<22}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'per s':>10}{'peak KiB':>11}{'base p50':>10}")
+    for stage, stats in results["stages"].items():
+        old = (baseline or {}).get("stages", {}).get(stage, {})
+        print(f"{stage:<22}{stats['p50_ms']:>10}{stats['p90_ms']:>10}{stats['p99_ms']:>10}"
+              f"{stats['throughput_per_s']:>10}{stats['peak_kib']:>11}{old.get('p50_ms', '-'):>10}")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark the analysis stages on a synthetic resume corpus.")
+    arg_parser.add_argument("--quick", action="store_true", help="One document per variant, one repeat")
+    arg_parser.add_argument("-o", "--output", help="Write the results JSON here")
+    arg_parser.add_argument("--baseline", default=BASELINE_PATH)
+    arg_parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    arg_parser.add_argument("--network-latency", type=float, default=0.0,
+                            help="Seconds each fake web search / job scrape takes")
+    args = arg_parser.parse_args()
+
+    # Pickled models from another scikit-learn version warn on every load
+    warnings.filterwarnings("ignore")
+    results = run(quick=args.quick, network_latency=args.network_latency)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print_report(results, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+    if baseline is None:
+        sys.exit(0)
+
+    old_meta, new_meta = baseline["meta"], results["meta"]
+    for key in ("mode", "cpus", "python"):
+        if old_meta.get(key) != new_meta.get(key):
+            print(f"Warning: baseline {key} is {old_meta.get(key)!r}, this run is {new_meta.get(key)!r}")
+    regressions = compare(results, baseline, args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    sys.exit(1 if regressions else 0)
@@ -1,25 +1,44 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, File, UploadFile, HTTPException, Response, Header
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import asyncio
+import json
 import os
 import shutil
 import re
-from services.parser import extract_text
-from services.predictor import JobPredictor
-
-# Defensive imports for JobSpy
-try:
-    from jobspy import scrape_jobs
-except ImportError:
-    scrape_jobs = None
+import secrets
+import threading
+from services import batch, executors, ingest, metrics, model_registry, outbound, startup
+from services.parser import load_backends
+from services.model_registry import ModelWatcher, get_predictor
+from services.result_cache import ResultCache, make_key
+from services.job_worker import JobScrapeWorker, SCRAPING_AVAILABLE
+from services.job_store import open_store
+from services.analysis import JOB_FIELDS, AnalysisError, build_pipeline
 
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
+@asynccontextmanager
+async def lifespan(app):
+    if SCRAPING_AVAILABLE:
+        job_worker.start()
+    model_watcher.start()
+    if WARMUP:
+        # In the background: the server accepts connections right away, and
+        # requests that arrive first load whatever they need themselves
+        threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+    yield
+    model_watcher.stop()
+    job_worker.stop()
+    if job_store is not None:
+        job_store.close()
+    executors.shutdown()
 
-app = FastAPI(title="Resume Intelligence API")
+app = FastAPI(title="Resume Intelligence API", lifespan=lifespan)
 
 # CORS Configuration
 app.add_middleware(
@@ -27,126 +46,431 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Model-Version", "X-Cache"],
 )
 
-from services.skill_extractor import extract_skills
+@app.middleware("http")
+async def http_metrics(request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Route templates (e.g. /jobs/{token}) keep label cardinality bounded
+    route = getattr(request.scope.get("route"), "path", None) or "static"
+    metrics.HTTP_REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+    metrics.HTTP_SECONDS.observe(time.perf_counter() - started, method=request.method, route=route)
+    return response
+
+# Uploads whose request body is already too large are refused unread
+UPLOAD_ROUTES = {
+    "/analyze": ingest.MAX_BYTES,
+    "/analyze/stream": ingest.MAX_BYTES,
+    "/analyze/batch": batch.MAX_UPLOAD_BYTES,
+}
+
+@app.middleware("http")
+async def upload_limit(request, call_next):
+    max_bytes = UPLOAD_ROUTES.get(request.url.path)
+    if request.method == "POST" and max_bytes is not None \
+            and ingest.body_too_large(request.headers.get("content-length"), max_bytes):
+        return JSONResponse(status_code=413, content={"detail": ingest.too_large_message(max_bytes)})
+    return await call_next(request)
+
+@app.middleware("http")
+async def model_version_header(request, call_next):
+    response = await call_next(request)
+    # The model loads on first use (or in the warm-up): no version before that
+    version = model_registry.current_version()
+    if version is not None:
+        response.headers["X-Model-Version"] = version
+    return response
+
 from services.intelligence_engine import IntelligenceEngine
+from services.taxonomy import get_taxonomy
 
 # Initialize Predictor and Intelligence Engine
-predictor = JobPredictor()
+predictor = get_predictor()
 intelligence = IntelligenceEngine()
 
-@app.post("/analyze")
-async def analyze_resume(file: UploadFile = File(...)):
-    file_ext = file.filename.split('.')[-1].lower()
-    if file_ext not in ["pdf", "docx", "txt"]:
+# Full responses keyed by upload hash; set RESULT_CACHE_PATH to persist them
+result_cache = ResultCache(
+    max_entries=int(os.environ.get("RESULT_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("RESULT_CACHE_TTL", 3600)),
+    path=os.environ.get("RESULT_CACHE_PATH") or None,
+)
+
+# Picks up bundles published by train_model.py without a restart (0 disables)
+model_watcher = ModelWatcher(interval=float(os.environ.get("MODEL_RELOAD_INTERVAL", 30)))
+
+# Stage durations in a Server-Timing header on /analyze responses
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "1").lower() not in ("0", "false", "no")
+
+# Preload the model, parsers and parse workers once the server has started
+WARMUP = os.environ.get("STARTUP_WARMUP", "1").lower() not in ("0", "false", "no")
+WARMUP_TEXT = "Python developer with SQL, Docker and machine learning experience."
+
+# Job listings are scraped in the background and served from its store
+job_worker = JobScrapeWorker(
+    refresh_interval=float(os.environ.get("JOB_REFRESH_INTERVAL", 1800)),
+    idle_ttl=float(os.environ.get("JOB_IDLE_TTL", 86400)),
+    path=os.environ.get("JOB_STORE_PATH") or None,
+)
+
+# Local postings (ingested with `python -m services.job_store ingest ...`)
+# answer job suggestions without the network when they have matches
+job_store = open_store()
+
+def _collect_cache_stats():
+    """Scrape-time cache and job-store gauges for /metrics."""
+    caches = {"result": result_cache.stats(), "web_discovery": intelligence.web_cache.stats()}
+    for cache, stats in caches.items():
+        yield ("resume_cache_entries", "gauge", "Entries held per cache.", {"cache": cache}, stats["entries"])
+        for result in ("hits", "misses", "coalesced"):
+            if result in stats:
+                yield ("resume_cache_requests_total", "counter", "Cache lookups by cache and result.",
+                       {"cache": cache, "result": result}, stats[result])
+    jobs = job_worker.stats()
+    yield ("resume_job_queries", "gauge", "Search queries tracked by the job worker.", {}, jobs["entries"])
+    yield ("resume_job_queue_depth", "gauge", "Queries waiting to be scraped.", {}, jobs["queued"])
+    for service, stats in outbound.provider_stats().items():
+        yield ("resume_circuit_open", "gauge", "1 while calls to an external service are short-circuited.",
+               {"service": service}, int(stats["state"] != "closed"))
+    for phase, seconds in list(startup.PHASES.items()):
+        yield ("resume_startup_seconds", "gauge", "Duration of each startup phase of this worker.",
+               {"phase": phase}, seconds)
+
+metrics.REGISTRY.register_collector(_collect_cache_stats)
+
+def _warm_up():
+    """Loads what the first request would otherwise wait for."""
+    try:
+        with startup.timed_phase("warmup"):
+            # 1. Model arrays, plus scikit-learn (imported by the first prediction)
+            with startup.timed_phase("warmup_model"):
+                predictor.predict(WARMUP_TEXT)
+            # 2. PDF / DOCX libraries, imported before the parse workers fork
+            with startup.timed_phase("warmup_parsers"):
+                load_backends()
+            # 3. Parse worker processes (they inherit the imports above)
+            with startup.timed_phase("warmup_workers"):
+                executors.warm_up()
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+        return
+    print(f"Startup: {startup.summary()}")
+
+def _search_links(search_query):
+    """Fallback job board search links based on the Super Query."""
+    return [
+        {"title": f"Search on LinkedIn", "company": f"Query: {search_query}", "url": f"https://www.linkedin.com/jobs/search/?keywords={search_query.replace(' ', '%20')}", "platform": "LinkedIn"},
+        {"title": f"Search on Indeed", "company": f"Query: {search_query}", "url": f"https://www.indeed.com/jobs?q={search_query.replace(' ', '+')}", "platform": "Indeed"}
+    ]
+
+def _job_suggestions(search_query, top_role, detected_skills):
+    """
+    Returns the job fields of the response without touching the network:
+    matching postings from the local store, else scraped listings when
+    ready, otherwise search links plus a token the client can poll at
+    /jobs/{token}.
+    """
+    # Use the top discovered role as the base for scraping if super_query isn't specific enough
+    scrape_query = search_query if search_query != "Job Postings" else top_role
+
+    if job_store is not None:
+        postings = job_store.search(scrape_query, detected_skills, role=top_role)
+        if postings:
+            return {"job_suggestions": postings, "job_status": "ready", "job_token": None}
+
+    if not SCRAPING_AVAILABLE:
+        return {"job_suggestions": _search_links(search_query), "job_status": "unavailable", "job_token": None}
+
+    listing = job_worker.lookup(scrape_query)
+    return {
+        "job_suggestions": listing["jobs"] or _search_links(search_query),
+        "job_status": listing["status"],
+        "job_token": listing["token"],
+    }
+
+# Stage DAG shared with the Streamlit app (see services/analysis.py)
+analysis = build_pipeline(predictor, intelligence, job_suggestions=_job_suggestions)
+
+async def _ingest(file, timings):
+    """
+    Bounded read of an upload plus content sniffing. Returns (bytes, type)
+    or raises an HTTPException for oversized, mislabeled or malformed files.
+    """
+    if ingest.declared_type(file.filename) is None:
         raise HTTPException(status_code=400, detail="Unsupported file format")
+    try:
+        with timings.stage("read"):
+            contents = await ingest.read_upload(file)
+            return contents, ingest.check_upload(contents, file.filename)
+    except ingest.UploadError as e:
+        timings.error("read", "rejected")
+        raise HTTPException(status_code=e.status, detail=e.message)
+
+# Response fields grouped into the stream events that carry them
+EVENTS = {
+    "text": ("extracted_text", "extraction"),
+    "skills": ("detected_skills",),
+    "ats": ("ats_score",),
+    # TF-IDF roles from the trained model
+    "roles": ("role_predictions",),
+    # Structured entries in sections: {section: [{title, details, start, end}]}
+    "context": ("projects", "experience", "sections"),
+    "matches": ("role_matches", "skill_roadmap", "super_query"),
+    "jobs": JOB_FIELDS,
+}
+RESPONSE_FIELDS = tuple(field for fields in EVENTS.values() for field in fields)
+
+# Nested under "deep_intelligence" in the /analyze response
+DEEP_FIELDS = ("projects", "experience", "sections", "super_query")
+
+# Job listings change independently of the resume, so they are not cached
+CACHED_FIELDS = tuple(field for field in RESPONSE_FIELDS if field not in JOB_FIELDS)
 
+def _requested_fields(fields, include_text):
+    """Response fields named in ?fields= (comma separated; default all)."""
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in RESPONSE_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    else:
+        requested = list(RESPONSE_FIELDS)
+    if not include_text and "extracted_text" in requested:
+        # Clients that do not show the text can skip echoing it back
+        requested.remove("extracted_text")
+    return requested
+
+def _build_result(values):
+    """Nests pipeline fields into the /analyze response; absent fields are left out."""
+    result = {field: values[field] for field in RESPONSE_FIELDS if field in values and field not in DEEP_FIELDS}
+    deep_intelligence = {field: values[field] for field in DEEP_FIELDS if field in values}
+    if deep_intelligence:
+        result["deep_intelligence"] = deep_intelligence
+    return result
+
+def _flatten_result(result):
+    """Pipeline fields of a (cached) /analyze response."""
+    values = {field: value for field, value in result.items() if field in RESPONSE_FIELDS}
+    values.update(result.get("deep_intelligence", {}))
+    return values
+
+async def _analysis_events(contents, file_ext, timings, fields=RESPONSE_FIELDS):
+    """
+    The analysis pipeline as a sequence of (event, data) pairs, one per
+    EVENTS group as soon as its requested fields are computed:
+      text, skills        - extracted text, then detected skills
+      ats, roles, context - local scoring, in completion order
+      matches             - discovered roles, suitability and roadmap
+      jobs                - job suggestions (never cached)
+      done                - {"cache": "hit" | "miss", "model_version"}
+    Only the stages the requested fields depend on run. A failure yields
+    ("error", {"status", "error"}) and ends the sequence.
+    """
+    # Identical uploads against the same model/taxonomy skip all work
+    with timings.stage("cache"):
+        # The first read loads (memory-maps) the model: keep it off the event loop
+        model_version = await executors.run_in_thread("local", getattr, predictor, "version")
+        cache_key = make_key(contents, file_ext, model_version, get_taxonomy().digest)
+        cached = result_cache.get(cache_key)
+
+    values = {"contents": contents, "file_ext": file_ext}
+    if cached is not None:
+        values.update(_flatten_result(cached))
+
+    emitted = set()
+    def ready_events():
+        for event, event_fields in EVENTS.items():
+            wanted = [field for field in event_fields if field in fields]
+            if wanted and event not in emitted and all(field in values for field in wanted):
+                emitted.add(event)
+                yield event, {field: values[field] for field in wanted}
+
+    for event in ready_events():
+        yield event
     try:
-        resume_text = extract_text(file.file, file_ext)
-        
-        if not resume_text:
-            return JSONResponse(
-                status_code=422,
-                content={"error": "Could not extract text from the provided file."}
-            )
-
-        # 1. Base Analysis
-        results = predictor.predict(resume_text)
-        ats_score = int(predictor.calculate_ats_score(resume_text))
-        detected_skills = extract_skills(resume_text)
-        
-        # 2. Deep Intelligence Analysis
-        deep_context = intelligence.analyze_context(resume_text)
-        
-        # Discover Top 3 Roles via Web
-        discovered_roles = intelligence.discover_roles_via_web(detected_skills, resume_text)
-        
-        # Analyze Suitability for each discovered role
-        role_matches = []
-        for role in discovered_roles:
-            suitability_data = intelligence.analyze_suitability(role, resume_text, predictor)
-            role_matches.append({
-                "role": role,
-                "score": float(suitability_data["score"]),
-                "description": suitability_data["reason"]
-            })
-        
-        # Sort roles by score so the BEST match is always results[0]
-        role_matches.sort(key=lambda x: x["score"], reverse=True)
-        
-        # Generate the "Super Query" for ultra-personalized scraping (passing full results for confidence check)
-        search_query = intelligence.generate_super_query(role_matches, detected_skills, resume_text)
-        
-        if not role_matches:
-            return JSONResponse(
-                status_code=500,
-                content={"error": "No roles could be discovered for this profile."}
-            )
-
-        # 3. Scrape personalized suggestions based on Super Query
-        job_suggestions = []
-        if scrape_jobs is not None:
-            try:
-                # Use the top discovered role as the base for scraping if super_query isn't specific enough
-                scrape_query = search_query if search_query != "Job Postings" else role_matches[0]["role"]
-                
-                jobs = scrape_jobs(
-                    site_name=["indeed", "linkedin", "google"],
-                    search_term=scrape_query,
-                    location="remote",
-                    results_wanted=5,
-                    hours_old=72,
-                    country_indeed='USA'
-                )
-                
-                if jobs is not None and hasattr(jobs, 'empty') and not jobs.empty:
-                    for _, row in jobs.iterrows():
-                        job_suggestions.append({
-                            "title": str(row.get('title', 'Job Opening')),
-                            "company": str(row.get('company', 'Company')),
-                            "url": str(row.get('job_url', '#')),
-                            "platform": str(row.get('site', 'Job Board'))
-                        })
-            except Exception as e:
-                print(f"Scraping logic execution error: {e}")
-
-        # Fallback to search links based on Super Query
-        if not job_suggestions:
-            job_suggestions = [
-                {"title": f"Search on LinkedIn", "company": f"Query: {search_query}", "url": f"https://www.linkedin.com/jobs/search/?keywords={search_query.replace(' ', '%20')}", "platform": "LinkedIn"},
-                {"title": f"Search on Indeed", "company": f"Query: {search_query}", "url": f"https://www.indeed.com/jobs?q={search_query.replace(' ', '+')}", "platform": "Indeed"}
-            ]
-
-        # Generate Skill Roadmap for the Top Role
-        skill_roadmap = intelligence.generate_skill_roadmap(role_matches[0]["role"], detected_skills)
-
-        return {
-            "role_matches": role_matches,
-            "ats_score": ats_score,
-            "detected_skills": detected_skills,
-            "skill_roadmap": skill_roadmap,
-            "deep_intelligence": {
-                "projects": deep_context["projects"],
-                "experience": deep_context["experience"],
-                "super_query": search_query
-            },
-            "job_suggestions": job_suggestions,
-            "extracted_text": resume_text
-        }
+        missing = [field for field in fields if field not in values]
+        async for _, outputs in analysis.run(values, missing, timings):
+            values.update(outputs)
+            for event in ready_events():
+                yield event
+    except AnalysisError as e:
+        yield "error", {"status": e.status, "error": e.message}
+        return
+
+    # Only complete results are cached (a ?fields= subset skips the rest)
+    if cached is None and all(field in values for field in CACHED_FIELDS):
+        result_cache.set(cache_key, _build_result({field: values[field] for field in CACHED_FIELDS}))
+    yield "done", {"cache": "miss" if cached is None else "hit", "model_version": model_version}
+
+@app.post("/analyze")
+async def analyze_resume(response: Response, file: UploadFile = File(...), debug: bool = False,
+                         include_text: bool = True, fields: Optional[str] = None):
+    """
+    Full analysis of one resume. ?fields=ats_score,detected_skills limits
+    the response (and the work done) to the named fields: such a request
+    never waits for web discovery or job lookups.
+    """
+    requested = _requested_fields(fields, include_text)
+    timings = metrics.RequestTimings("analyze")
+    contents, file_ext = await _ingest(file, timings)
+
+    try:
+        values = {}
+        async for event, data in _analysis_events(contents, file_ext, timings, requested):
+            if event == "error":
+                return JSONResponse(status_code=data["status"], content={"error": data["error"]})
+            if event == "done":
+                done = data
+            else:
+                values.update(data)
+
+        result = {**_build_result(values), **done}
+        response.headers["X-Cache"] = done["cache"]
+
+        # Per-stage durations: Server-Timing header, plus a JSON field on ?debug=true
+        timings.finish()
+        if SERVER_TIMING:
+            response.headers["Server-Timing"] = timings.server_timing()
+        if debug:
+            result["timings"] = timings.milliseconds()
+        return result
 
     except Exception as e:
         import traceback
         print("Backend Error Traceback:")
         traceback.print_exc()
+        timings.error("request", type(e).__name__)
         return JSONResponse(
             status_code=500,
             content={"error": f"Internal system error: {str(e)}"}
         )
 
+@app.post("/analyze/stream")
+async def analyze_resume_stream(file: UploadFile = File(...), debug: bool = False,
+                                include_text: bool = True, fields: Optional[str] = None):
+    """
+    Same analysis as /analyze, streamed as NDJSON: one {"event", "data"}
+    line per stage as it completes, so local results (skills, ATS score,
+    TF-IDF roles) arrive before the web discovery and job lookups finish.
+    The last line is a "done" event (with stage timings on ?debug=true),
+    or an "error" event.
+    """
+    requested = _requested_fields(fields, include_text)
+    timings = metrics.RequestTimings("analyze_stream")
+    contents, file_ext = await _ingest(file, timings)
+
+    async def stream_events():
+        try:
+            async for event, data in _analysis_events(contents, file_ext, timings, requested):
+                if event == "done":
+                    timings.finish()
+                    if debug:
+                        data = {**data, "timings": timings.milliseconds()}
+                yield json.dumps({"event": event, "data": data}) + "\n"
+        except Exception as e:
+            import traceback
+            print("Backend Error Traceback:")
+            traceback.print_exc()
+            timings.error("request", type(e).__name__)
+            yield json.dumps({"event": "error", "data": {"status": 500, "error": f"Internal system error: {str(e)}"}}) + "\n"
+
+    return StreamingResponse(stream_events(), media_type="application/x-ndjson")
+
+@app.post("/analyze/batch")
+async def analyze_batch(files: List[UploadFile] = File(...)):
+    """
+    Local analysis (ATS score, skills, TF-IDF roles) for many resumes,
+    uploaded as several files and/or zip archives. Results are streamed
+    back as NDJSON, one line per resume, as each chunk completes.
+    """
+    # 1. Read the uploads in blocks (bounded in total); archives are only
+    # listed here, their members are decompressed chunk by chunk below
+    uploads = []
+    uploaded = 0
+    expanded = 0
+    for upload in files:
+        try:
+            data = await ingest.read_upload(upload, batch.MAX_UPLOAD_BYTES - uploaded)
+        except ingest.UploadError as e:
+            if e.status != 422:
+                raise HTTPException(status_code=e.status, detail=ingest.too_large_message(batch.MAX_UPLOAD_BYTES))
+            # Empty file: reported in its result line
+            data = b""
+        uploaded += len(data)
+        if upload.filename.lower().endswith('.zip'):
+            try:
+                expanded += batch.zip_size(data)
+            except Exception:
+                raise HTTPException(status_code=400, detail=f"Invalid zip archive: {upload.filename}")
+        else:
+            expanded += len(data)
+        uploads.append((upload.filename, data))
+
+    if expanded > batch.MAX_TOTAL_BYTES:
+        raise HTTPException(status_code=413, detail=f"Resumes exceed the {batch.MAX_TOTAL_BYTES} byte batch limit once unzipped")
+    chunk_iter = batch.chunks(batch.iter_upload_documents(uploads))
+    first_chunk = await executors.run_in_thread("parse", next, chunk_iter, None)
+    if first_chunk is None:
+        raise HTTPException(status_code=400, detail="No resumes found in the upload")
+
+    async def stream_results():
+        timings = metrics.RequestTimings("analyze_batch")
+        chunk = first_chunk
+        while chunk is not None:
+            names = [name for name, _ in chunk]
+            with timings.stage("parse"):
+                texts = await asyncio.gather(
+                    *(executors.run_in_process("parse", batch.extract_document, data, name) for name, data in chunk),
+                    return_exceptions=True
+                )
+            for text in texts:
+                if isinstance(text, BaseException):
+                    timings.error("parse", type(text).__name__)
+            texts = ["" if isinstance(text, BaseException) else text for text in texts]
+            with timings.stage("local"):
+                results = await executors.run_in_thread("local", batch.analyze_texts, predictor, list(zip(names, texts)))
+            for result in results:
+                yield json.dumps(result) + "\n"
+            # Only the next chunk's members are decompressed (off the event loop)
+            with timings.stage("read"):
+                chunk = await executors.run_in_thread("parse", next, chunk_iter, None)
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post("/admin/reload-model")
+async def reload_model(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """
+    Loads the latest published model bundle in the background and swaps it
+    in; requests keep being served by the old model meanwhile. Requires
+    ADMIN_TOKEN to be set and sent as the X-Admin-Token header.
+    """
+    admin_token = os.environ.get("ADMIN_TOKEN")
+    if not admin_token or not x_admin_token or not secrets.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    try:
+        return await executors.run_in_thread("reload", model_registry.reload_model, force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {e}")
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text-format metrics of this worker process."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/jobs/{token}")
+async def job_listings(token: str):
+    """Polling endpoint for job suggestions that were pending in /analyze."""
+    listing = job_worker.poll(token)
+    if listing is None:
+        raise HTTPException(status_code=404, detail="Unknown job token")
+    return {"job_status": listing["status"], "job_token": token, "job_suggestions": listing["jobs"]}
+
 # Serve static files
 app.mount("/", StaticFiles(directory="static", html=True), name="static")
 
+startup.record("import", time.perf_counter() - _import_started)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="127.0.0.1", port=5000)
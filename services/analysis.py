@@ -0,0 +1,110 @@
+import asyncio
+
+from services import executors, metrics
+from services.document import ResumeDocument
+from services.parser import extract_text_report_from_bytes
+from services.pipeline import Pipeline, Stage
+from services.skill_extractor import extract_skills
+
+# Fields of a job suggestions stage (see build_pipeline)
+JOB_FIELDS = ("job_suggestions", "job_status", "job_token")
+
+
+class AnalysisError(RuntimeError):
+    """An upload that cannot be analyzed; status is the HTTP status to answer with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def build_pipeline(predictor, intelligence, job_suggestions=None):
+    """
+    The resume analysis as a Pipeline over the inputs "contents" (upload
+    bytes) and "file_ext". job_suggestions(search_query, top_role,
+    detected_skills), when given, adds the JOB_FIELDS stage.
+
+    parse -> document -> skills, ats, predict, context
+                         skills -> discovery -> suitability -> super_query, roadmap -> jobs
+
+    Roles are discovered offline by the model's role classifier; the web
+    search runs only as enrichment (intelligence.web_enrichment) or for a
+    model without a classifier.
+    """
+    async def parse(contents, file_ext):
+        # PDF/DOCX parsing is CPU bound: keep it off the event loop
+        try:
+            resume_text, extraction = await executors.run_in_process("parse", extract_text_report_from_bytes, contents, file_ext)
+        except asyncio.TimeoutError:
+            raise AnalysisError(504, "Timed out extracting text from the provided file.")
+        if not resume_text:
+            raise AnalysisError(422, "Could not extract text from the provided file.")
+        return resume_text, extraction
+
+    def ats_score(document):
+        return int(predictor.calculate_ats_score(document))
+
+    async def discovery(detected_skills, document):
+        # Discover Top 3 Roles with the role classifier (no network, well under a millisecond)
+        roles, role_scores = intelligence.rank_roles(detected_skills, document, predictor)
+        if roles and not intelligence.web_enrichment:
+            return roles, role_scores
+        try:
+            if not roles:
+                roles = await executors.run_in_thread("discovery", intelligence.discover_roles_via_web, detected_skills, document.text)
+                return roles, role_scores
+            # Roles named on the web are extra candidates for the suitability check
+            web_roles = await executors.run_in_thread("discovery", intelligence.web_roles, detected_skills)
+            return roles + [role for role in web_roles if role not in roles], role_scores
+        except asyncio.TimeoutError:
+            print("Web discovery timed out; using fallback roles")
+            metrics.STAGE_ERRORS.inc(endpoint="analyze", stage="discovery", error="timeout")
+            return roles or list(intelligence.WEB_FALLBACK_ROLES), role_scores
+
+    def suitability(discovered_roles, role_scores, document):
+        # Analyze Suitability for each discovered role
+        role_matches = []
+        for role in discovered_roles:
+            suitability_data = intelligence.analyze_suitability(role, document, predictor, role_scores.get(role))
+            role_matches.append({
+                "role": role,
+                "score": float(suitability_data["score"]),
+                "description": suitability_data["reason"]
+            })
+        if not role_matches:
+            raise AnalysisError(500, "No roles could be discovered for this profile.")
+        # Sort roles by score so the BEST match is always results[0]
+        role_matches.sort(key=lambda x: x["score"], reverse=True)
+        return role_matches
+
+    def roadmap(role_matches, detected_skills):
+        # Generate Skill Roadmap for the Top Role
+        return intelligence.generate_skill_roadmap(role_matches[0]["role"], detected_skills)
+
+    def jobs(search_query, role_matches, detected_skills):
+        return job_suggestions(search_query, role_matches[0]["role"], detected_skills)
+
+    stages = [
+        Stage("parse", parse, ("contents", "file_ext"), ("extracted_text", "extraction")),
+        # Lower-cased text, tokens, skill hits and sections are computed once
+        # and shared by every stage below
+        Stage("document", ResumeDocument, ("extracted_text",), ("document",)),
+        Stage("skills", extract_skills, ("document",), ("detected_skills",)),
+        # Local scoring runs in the thread pool while the web search is in flight
+        Stage("ats", ats_score, ("document",), ("ats_score",), run="thread", timeout="local"),
+        Stage("predict", predictor.predict, ("document",), ("role_predictions",), run="thread", timeout="local"),
+        Stage("context", intelligence.analyze_context, ("document",), ("projects", "experience", "sections"),
+              run="thread", timeout="local"),
+        Stage("discovery", discovery, ("detected_skills", "document"), ("discovered_roles", "role_scores")),
+        Stage("suitability", suitability, ("discovered_roles", "role_scores", "document"), ("role_matches",)),
+        # The "Super Query" for ultra-personalized scraping (full results for the confidence check)
+        Stage("super_query", intelligence.generate_super_query, ("role_matches", "detected_skills", "document"),
+              ("super_query",)),
+        Stage("roadmap", roadmap, ("role_matches", "detected_skills"), ("skill_roadmap",)),
+    ]
+    if job_suggestions is not None:
+        # The local postings search runs SQLite queries: keep it off the event loop
+        stages.append(Stage("jobs", jobs, ("super_query", "role_matches", "detected_skills"), JOB_FIELDS,
+                            run="thread", timeout="local"))
+    return Pipeline(stages)
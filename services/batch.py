@@ -0,0 +1,154 @@
+import io
+import os
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from services.document import ResumeDocument
+from services.parser import extract_text_from_bytes, load_backends
+from services.skill_extractor import extract_skills
+
+SUPPORTED_TYPES = ("pdf", "docx", "txt")
+
+# Limits for archives (member count and uncompressed size per member)
+MAX_ARCHIVE_MEMBERS = int(os.environ.get("BATCH_MAX_FILES", 1000))
+MAX_MEMBER_BYTES = int(os.environ.get("BATCH_MAX_FILE_BYTES", 10 * 1024 * 1024))
+
+# Limits per /analyze/batch request: bytes uploaded, and bytes of resumes
+# once zip archives are expanded (checked before anything is decompressed)
+MAX_UPLOAD_BYTES = int(os.environ.get("BATCH_MAX_UPLOAD_BYTES", 100 * 1024 * 1024))
+MAX_TOTAL_BYTES = int(os.environ.get("BATCH_MAX_TOTAL_BYTES", 200 * 1024 * 1024))
+
+# Resumes parsed and vectorized together per step
+CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", 64))
+
+
+def file_type(name):
+    """Returns the supported extension of a file name, or None."""
+    ext = name.rsplit('.', 1)[-1].lower() if '.' in name else ""
+    return ext if ext in SUPPORTED_TYPES else None
+
+
+def _zip_members(archive):
+    members = [
+        info for info in archive.infolist()
+        if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+    ]
+    return [info for info in members[:MAX_ARCHIVE_MEMBERS] if file_type(info.filename) is not None]
+
+
+def zip_size(data):
+    """
+    Bytes iter_zip_documents would decompress from an archive, from its
+    directory alone (zipfile never reads a member past its declared size).
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return sum(info.file_size for info in _zip_members(archive) if info.file_size <= MAX_MEMBER_BYTES)
+
+
+def iter_zip_documents(data):
+    """
+    Yields (name, bytes) for every supported resume inside a zip archive,
+    decompressing each member only when it is requested.
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in _zip_members(archive):
+            if info.file_size > MAX_MEMBER_BYTES:
+                yield info.filename, None
+                continue
+            try:
+                data = archive.read(info)
+            except (zipfile.BadZipFile, zlib.error, EOFError):
+                # Corrupt member: reported as a failed extraction
+                data = b""
+            yield info.filename, data
+
+
+def iter_upload_documents(uploads):
+    """Yields (name, bytes) for uploaded (name, data) pairs, expanding zip archives lazily."""
+    for name, data in uploads:
+        if name.lower().endswith('.zip'):
+            yield from iter_zip_documents(data)
+        else:
+            yield name, data
+
+
+def iter_path_documents(paths):
+    """Yields (name, bytes) for resume files, directories and zip archives."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if file_type(name) is not None:
+                        with open(os.path.join(root, name), 'rb') as f:
+                            yield os.path.join(root, name), f.read()
+        elif path.lower().endswith('.zip'):
+            with open(path, 'rb') as f:
+                yield from iter_zip_documents(f.read())
+        else:
+            with open(path, 'rb') as f:
+                yield path, f.read()
+
+
+def chunks(items, size=CHUNK_SIZE):
+    """Groups an iterable into lists of at most size items."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_texts(predictor, named_texts, top_k=3):
+    """
+    Local (network-free) analysis of many resumes. Role predictions for the
+    whole group come from a single predict_batch call.
+
+    named_texts: list of (name, text); text is None for unsupported or
+    oversized files and "" when extraction failed.
+    """
+    documents = [ResumeDocument(text) for _, text in named_texts]
+    model_version = predictor.version
+    predictions = predictor.predict_batch(documents, top_k=top_k)
+
+    results = []
+    for (name, text), document, roles in zip(named_texts, documents, predictions):
+        if text is None:
+            results.append({"file": name, "error": "Unsupported or oversized file"})
+        elif not text:
+            results.append({"file": name, "error": "Could not extract text from the provided file."})
+        else:
+            results.append({
+                "file": name,
+                "ats_score": int(predictor.calculate_ats_score(document)),
+                "detected_skills": extract_skills(document),
+                "role_predictions": roles,
+                "model_version": model_version,
+            })
+    return results
+
+
+def extract_document(data, name):
+    """Extracts text for one batch document (picklable for worker processes)."""
+    ext = file_type(name)
+    if data is None or ext is None:
+        return None
+    return extract_text_from_bytes(data, ext)
+
+
+def run_batch(predictor, documents, workers=None, chunk_size=CHUNK_SIZE, top_k=3):
+    """
+    Synchronous batch pipeline (used by the CLI): texts are extracted in a
+    process pool, then each chunk is scored together. Yields one result dict
+    per document, in input order.
+    """
+    # Imported once here rather than in every forked worker
+    load_backends()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks(documents, chunk_size):
+            names = [name for name, _ in chunk]
+            texts = list(pool.map(extract_document, [data for _, data in chunk], names))
+            yield from analyze_texts(predictor, list(zip(names, texts)), top_k=top_k)
@@ -1,22 +1,108 @@
+import os
 import re
+import string
+import unicodedata
 
-def clean_text(text):
+# Unicode-aware cleaning keeps non-English letters (e.g. "josé", "数据");
+# the model must be retrained after changing it, so it is a global switch
+UNICODE = os.environ.get("CLEANER_UNICODE", "").lower() in ("1", "true", "yes")
+
+# Default cleaning is one bytes.translate call deleting every byte that is
+# not an ASCII letter or whitespace. Other characters are dropped by the
+# ASCII encode, except Unicode whitespace, which still separates words.
+_ASCII_KEEP = set((string.ascii_letters + ''.join(chr(c) for c in range(128) if chr(c).isspace())).encode('ascii'))
+_ASCII_DELETE = bytes(c for c in range(256) if c not in _ASCII_KEEP)
+_UNICODE_SPACE = re.compile('[' + ''.join(chr(c) for c in range(128, 0x3001) if chr(c).isspace()) + ']')
+
+# Anything but letters (any script) and whitespace
+_NON_LETTER = re.compile(r'[^\w\s]|[\d_]')
+
+
+def clean_text(text, unicode=None):
     """
     Cleans the input text by:
     1. Converting to lowercase
     2. Removing special characters and numbers (keeping only alphabets and spaces)
     3. Removing extra whitespace
+    With unicode=True (default: CLEANER_UNICODE) letters of every script are
+    kept, after NFKC normalization (full-width forms, ligatures).
     """
     if not text:
         return ""
-    
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Remove special characters and numbers, keep only letters and spaces
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
-    
+
+    if unicode is None:
+        unicode = UNICODE
+
+    if unicode:
+        if not unicodedata.is_normalized('NFKC', text):
+            text = unicodedata.normalize('NFKC', text)
+        text = _NON_LETTER.sub('', text.lower())
+    else:
+        # Convert to lowercase, then keep only a-z letters and spaces
+        text = text.lower()
+        if not text.isascii():
+            text = _UNICODE_SPACE.sub(' ', text)
+        text = text.encode('ascii', 'ignore').translate(None, _ASCII_DELETE).decode('ascii')
+
     # Remove extra whitespace (multiple spaces/newlines become single space)
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+    return ' '.join(text.split())
+
+def clean_texts(texts, unicode=None):
+    """
+    Batch clean_text for a list/array/Series of documents (None or NaN-like
+    non-strings become ""). Used by training and JobPredictor.predict_batch.
+    """
+    return [clean_text(text, unicode) if isinstance(text, str) else "" for text in texts]
+
+def iter_lines(chunks):
+    """
+    Re-chunks streamed text so every block ends on a line boundary
+    (the incomplete last line is carried into the next block).
+    """
+    carry = ""
+    for chunk in chunks:
+        text = carry + chunk
+        cut = text.rfind('\n') + 1
+        carry = text[cut:]
+        if cut:
+            yield text[:cut]
+    if carry:
+        yield carry
+
+def iter_clean_text(chunks):
+    """
+    Incremental clean_text for streamed text (e.g. parser.iter_text).
+    Joining the yielded pieces with a space equals clean_text of the whole.
+    """
+    for block in iter_lines(chunks):
+        cleaned = clean_text(block)
+        if cleaned:
+            yield cleaned
+
+def _benchmark(docs=2000, repeat=5):
+    """Micro-benchmark against the previous two-pass, uncompiled implementation."""
+    import random
+    import timeit
+
+    def previous(text):
+        if not text:
+            return ""
+        text = text.lower()
+        text = re.sub(r'[^a-zA-Z\s]', '', text)
+        return re.sub(r'\s+', ' ', text).strip()
+
+    random.seed(0)
+    words = ["Python", "SQL", "C++", "Node.js", "2019-2023", "e-mail:", "•", "Kubernetes", "(AWS)", "Led", "team", "of", "8"]
+    corpus = [" ".join(random.choices(words, k=400)) + "\n" for _ in range(docs)]
+    assert [previous(d) for d in corpus] == clean_texts(corpus, unicode=False)
+
+    timings = {
+        "previous": min(timeit.repeat(lambda: [previous(d) for d in corpus], number=1, repeat=repeat)),
+        "clean_texts": min(timeit.repeat(lambda: clean_texts(corpus, unicode=False), number=1, repeat=repeat)),
+        "clean_texts(unicode)": min(timeit.repeat(lambda: clean_texts(corpus, unicode=True), number=1, repeat=repeat)),
+    }
+    for name, seconds in timings.items():
+        print(f"{name:22s} {seconds * 1e6 / docs:8.1f} us/doc")
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,73 @@
+import re
+from collections import Counter
+from functools import cached_property
+
+from services.cleaner import clean_text
+from services.sections import get_segmenter
+from services.taxonomy import get_taxonomy
+
+_YEAR = re.compile(r'\b(20\d{2}|19\d{2})\b')
+
+
+class ResumeDocument:
+    """
+    One resume, analyzed once and shared by every stage of a request.
+
+    Each view (lower-cased text, tokens, cleaned text, skill hits, section
+    spans, ...) is computed on first access and then cached, so the ATS
+    score, skill extraction, role prediction, suitability and query
+    generation all reuse the same passes over the text. Functions that
+    take resume text accept either a plain string or a ResumeDocument.
+    """
+
+    def __init__(self, text):
+        self.text = text or ""
+
+    def __str__(self):
+        return self.text
+
+    @cached_property
+    def lower(self):
+        return self.text.lower()
+
+    @cached_property
+    def tokens(self):
+        """Whitespace-separated tokens of the lower-cased text."""
+        return self.lower.split()
+
+    @cached_property
+    def token_counts(self):
+        return Counter(self.tokens)
+
+    @cached_property
+    def clean(self):
+        """Text as the TF-IDF model sees it (see cleaner.clean_text)."""
+        return clean_text(self.text)
+
+    @cached_property
+    def years(self):
+        """Four-digit years (19xx/20xx) in order of appearance."""
+        return _YEAR.findall(self.text)
+
+    @cached_property
+    def skill_hits(self):
+        """{skill: [(start, end), ...]} for every taxonomy skill found."""
+        return get_taxonomy().matcher.match(self.text)
+
+    @cached_property
+    def skills(self):
+        return sorted(self.skill_hits)
+
+    @cached_property
+    def spans(self):
+        """Section entry spans in document order (see services.sections)."""
+        return get_segmenter().segment(self.text)
+
+    def skill_count(self, skill):
+        """How often a skill (or one of its aliases) is mentioned."""
+        return len(self.skill_hits.get(skill, ()))
+
+
+def as_document(text):
+    """Wraps plain text in a ResumeDocument; documents pass through."""
+    return text if isinstance(text, ResumeDocument) else ResumeDocument(text)
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Bounded pools shared by every request. CPU-heavy, self-contained work
+# (PDF parsing) goes to processes; work that needs in-memory state (the
+# loaded model) or waits on the network goes to threads.
+CPU_WORKERS = int(os.environ.get("ANALYZE_CPU_WORKERS", min(4, os.cpu_count() or 1)))
+IO_WORKERS = int(os.environ.get("ANALYZE_IO_WORKERS", 16))
+
+# Per-stage timeouts in seconds, overridable with ANALYZE_TIMEOUT_<STAGE>
+STAGE_TIMEOUTS = {
+    "parse": 20.0,
+    "local": 10.0,
+    "discovery": 8.0,
+}
+
+_process_pool = None
+_thread_pool = None
+
+
+def stage_timeout(stage):
+    """Returns the timeout for a pipeline stage."""
+    value = os.environ.get(f"ANALYZE_TIMEOUT_{stage.upper()}")
+    return float(value) if value else STAGE_TIMEOUTS.get(stage)
+
+
+def _init_worker():
+    # Workers are forked from the server and inherit its signal handlers:
+    # restore the defaults so shutdown() can terminate them, and leave
+    # Ctrl+C to the server
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def get_process_pool():
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=CPU_WORKERS, initializer=_init_worker)
+    return _process_pool
+
+
+def get_thread_pool():
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="analyze")
+    return _thread_pool
+
+
+def warm_up():
+    """Starts the worker processes now; they inherit whatever the parent has imported."""
+    get_process_pool().submit(int).result()
+
+
+async def run_in_process(stage, func, *args):
+    """Runs func(*args) in the process pool, bounded by the stage timeout."""
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_process_pool(), func, *args)
+    return await asyncio.wait_for(future, stage_timeout(stage))
+
+
+async def run_in_thread(stage, func, *args):
+    """Runs func(*args) in the thread pool, bounded by the stage timeout."""
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_thread_pool(), func, *args)
+    return await asyncio.wait_for(future, stage_timeout(stage))
+
+
+def shutdown():
+    """Stops both pools without waiting for abandoned (timed out) work."""
+    global _process_pool, _thread_pool
+    if _process_pool is not None:
+        # Taken first: shutdown() forgets them. Other child processes (e.g.
+        # the parser's page pool) are left alone
+        workers = list((_process_pool._processes or {}).values())
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+        # The server may exit right after this (uvicorn re-raises SIGTERM),
+        # before the pool's atexit hook runs: forked workers would outlive
+        # it and keep its listening socket open
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+        _thread_pool = None
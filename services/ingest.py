@@ -0,0 +1,114 @@
+import io
+import os
+import zipfile
+
+from services.parser import MAX_BYTES
+
+SUPPORTED_TYPES = ("pdf", "docx", "txt")
+
+# Uploads are copied out of the (already spooled) multipart file in blocks,
+# so an oversized file is rejected after MAX_BYTES, not after reading it all
+READ_BLOCK = 64 * 1024
+
+# Allowance for multipart framing when checking Content-Length up front
+FORM_OVERHEAD = 64 * 1024
+
+# Total uncompressed size allowed inside a DOCX (zip bomb guard)
+MAX_UNZIPPED_BYTES = int(os.environ.get("UPLOAD_MAX_UNZIPPED_BYTES", 100 * 1024 * 1024))
+
+# Bytes inspected when telling text from binary content
+_SNIFF_BYTES = 8192
+
+
+class UploadError(ValueError):
+    """Rejected upload; status is the HTTP status to answer with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def too_large_message(max_bytes=MAX_BYTES):
+    if max_bytes >= 1024 * 1024:
+        return f"File exceeds the {max_bytes / (1024 * 1024):g} MB upload limit"
+    return f"File exceeds the {max_bytes} byte upload limit"
+
+
+def declared_type(filename):
+    """Extension of an upload name if it is a supported type, else None."""
+    ext = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ""
+    return ext if ext in SUPPORTED_TYPES else None
+
+
+def body_too_large(content_length, max_bytes=MAX_BYTES):
+    """True if a request's Content-Length cannot fit a max_bytes upload."""
+    try:
+        return int(content_length) > max_bytes + FORM_OVERHEAD
+    except (TypeError, ValueError):
+        return False
+
+
+async def read_upload(upload, max_bytes=MAX_BYTES):
+    """Reads an UploadFile in blocks, stopping as soon as it exceeds max_bytes."""
+    blocks = []
+    size = 0
+    while True:
+        block = await upload.read(READ_BLOCK)
+        if not block:
+            break
+        size += len(block)
+        if size > max_bytes:
+            raise UploadError(413, too_large_message(max_bytes))
+        blocks.append(block)
+    if not size:
+        raise UploadError(422, "The uploaded file is empty")
+    return b"".join(blocks)
+
+
+def sniff_type(data):
+    """
+    Identifies an upload by its content: "pdf", "docx", "txt", or None for
+    anything else. Raises UploadError for truncated / malformed documents.
+    """
+    # 1. PDF: header near the start (readers allow leading junk). Damage is
+    # left to the parser: readers recover files with a missing or junk-padded trailer
+    if b"%PDF-" in data[:1024]:
+        return "pdf"
+
+    # 2. DOCX: a zip archive holding word/document.xml
+    if data.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                members = archive.infolist()
+        except zipfile.BadZipFile:
+            raise UploadError(422, "The DOCX file is truncated or malformed")
+        if not any(info.filename == "word/document.xml" for info in members):
+            return None
+        if sum(info.file_size for info in members) > MAX_UNZIPPED_BYTES:
+            raise UploadError(413, "The DOCX file expands beyond the allowed size")
+        return "docx"
+
+    # 3. Text: UTF-8 without NUL bytes
+    if b"\x00" in data[:_SNIFF_BYTES]:
+        return None
+    try:
+        data.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    return "txt"
+
+
+def check_upload(data, filename):
+    """
+    Returns the file type to parse an upload as. The content decides:
+    a PDF named .txt is parsed as a PDF, while text or unknown bytes
+    named .pdf / .docx are rejected instead of reaching the parsers.
+    """
+    declared = declared_type(filename)
+    if declared is None:
+        raise UploadError(400, "Unsupported file format")
+    sniffed = sniff_type(data)
+    if sniffed is None or (sniffed == "txt" and declared != "txt"):
+        raise UploadError(415, f"File content is not a valid {declared.upper()} document")
+    return sniffed
@@ -1,126 +1,149 @@
-import re
-try:
+import importlib.util
+import os
+from services.document import as_document
+from services.sections import format_span, get_segmenter
+from services.taxonomy import get_taxonomy
+from services.outbound import ClientPool, get_provider
+from services.ttl_cache import TTLCache
+
+def _ddgs():
+    # duckduckgo_search is imported when the first search client is built
     from duckduckgo_search import DDGS
-except ImportError:
-    DDGS = None
+    return DDGS()
 
 class IntelligenceEngine:
-    def __init__(self):
-        # Keywords to identify sections
-        self.sections = {
-            "experience": [r'experience', r'work history', r'employment', r'professional background'],
-            "projects": [r'projects', r'personal projects', r'academic projects', r'technical projects'],
-            "summary": [r'summary', r'objective', r'about me', r'profile']
-        }
+    # Returned when the web search fails or does not answer in time
+    WEB_FALLBACK_ROLES = ["Career Specialist", "Systems Designer", "Technical Strategist"]
+    # Roles discovered per resume
+    DISCOVERED_ROLES = 3
+    # Classifier confidence from which a role is described as a strong / partial match
+    STRONG_MATCH = 0.7
+    PARTIAL_MATCH = 0.3
+
+    def __init__(self, search_client=None):
+        # DDGS-compatible client factory (a local fake class can be injected)
+        if search_client is None and importlib.util.find_spec("duckduckgo_search") is not None:
+            search_client = _ddgs
+        self.search_client = search_client
+        # Long-lived clients (one per worker thread) keep their connections;
+        # calls go through the rate limiter, retries and circuit breaker
+        self.search_clients = ClientPool(lambda: self.search_client())
+        self.search_provider = get_provider("duckduckgo")
+        # Roles come from the model's role classifier; the web search only
+        # adds candidates when enabled (or serves models without a classifier)
+        self.web_enrichment = os.environ.get("ROLE_DISCOVERY_WEB", "").lower() in ("1", "true", "yes")
+
+        # Identical discovery queries share one cached / in-flight search
+        self.web_cache = TTLCache(
+            max_entries=int(os.environ.get("WEB_DISCOVERY_CACHE_SIZE", 1024)),
+            ttl=float(os.environ.get("WEB_DISCOVERY_CACHE_TTL", 6 * 3600)),
+        )
+
+        # Section headings compiled once; add_section() extends them
+        # (shared with ResumeDocument.spans)
+        self.segmenter = get_segmenter()
 
     def analyze_context(self, text):
         """
         Structure-aware deep context analysis.
         Identifies Titles vs Details to capture all projects and experiences accurately.
+        Returns one-line highlights for projects/experience plus the
+        structured entries of every section (see services.sections).
         """
-        if not text:
-            return {"projects": [], "experience": [], "super_query": ""}
-
-        lines = text.split('\n')
-        current_section = None
-        extracted_data = {
-            "experience": [],
-            "projects": [],
-            "summary": []
-        }
-
-        # Greedy section parser with Title detection
-        for i, line in enumerate(lines):
-            clean_line = line.strip()
-            if not clean_line or len(clean_line) < 3:
-                continue
+        document = as_document(text)
+        if not document.text:
+            return {"projects": [], "experience": [], "sections": {}}
 
-            lower_line = clean_line.lower()
-            
-            # 1. Section Identification
-            found_new_section = False
-            for section, patterns in self.sections.items():
-                if any(re.search(rf'^\s*{p}\s*$', lower_line) for p in patterns) or \
-                   any(re.search(rf'^\s*{p}\s*:', lower_line) for p in patterns) or \
-                   any(re.search(rf'^{p}$', lower_line) for p in patterns):
-                    current_section = section
-                    found_new_section = True
-                    break
-            
-            if found_new_section:
-                continue
-
-            # 2. Heuristic Content Extraction
-            if current_section:
-                # Capture all projects/experience entries (up to 100 lines for the section)
-                if len(extracted_data[current_section]) < 100:
-                    # Title detection: Short lines on their own likely represent titles
-                    # Bulleted items are definitely details
-                    is_detail = clean_line.startswith('•') or clean_line.startswith('*') or clean_line.startswith('-')
-                    
-                    if not is_detail and len(clean_line) < 60:
-                        # Potentially a Title/Header
-                        extracted_data[current_section].append(f"HEADER: {clean_line}")
-                    else:
-                        extracted_data[current_section].append(clean_line)
-
-        # 3. Post-Process into clean highlights
-        def process_items(items):
-            refined = []
-            current_group = []
-            for item in items:
-                if item.startswith("HEADER: "):
-                    if current_group:
-                        refined.append(" | ".join(current_group))
-                        current_group = []
-                    current_group.append(item.replace("HEADER: ", ""))
-                else:
-                    current_group.append(item)
-            if current_group:
-                refined.append(" | ".join(current_group))
-            return refined[:10] # Capture up to 10 distinct projects/roles
+        # Capture up to 10 distinct entries (projects/roles/...) per section
+        sections = self.segmenter.group(document.spans, limit=10)
 
         return {
-            "projects": process_items(extracted_data["projects"]),
-            "experience": process_items(extracted_data["experience"]),
+            "projects": [format_span(span) for span in sections["projects"]],
+            "experience": [format_span(span) for span in sections["experience"]],
+            "sections": sections,
         }
 
+    def rank_roles(self, detected_skills, resume_text, predictor):
+        """
+        Discovers the top roles offline with the model's role classifier.
+        Returns (roles, scores): the DISCOVERED_ROLES best role names and the
+        probability of every role the classifier knows. Both are empty when
+        the model has no role classifier.
+        """
+        ranked = predictor.rank_roles(resume_text, detected_skills)
+        return [match["role"] for match in ranked[:self.DISCOVERED_ROLES]], {match["role"]: match["score"] for match in ranked}
+
+    def web_roles(self, detected_skills):
+        """
+        Known roles named by a web search for the skills, used to enrich the
+        classifier's roles. Empty without skills, search client or results.
+        """
+        if not detected_skills or self.search_client is None:
+            return []
+        try:
+            return list(self._cached_search(detected_skills))
+        except Exception as e:
+            print(f"Web discovery error: {e}")
+            return []
+
     def discover_roles_via_web(self, detected_skills, resume_text):
         """
-        Discovers the top 3 best suitable roles by searching the internet.
+        Discovers the top 3 best suitable roles by searching the internet
+        (for models without a role classifier).
         """
         if not detected_skills:
             return ["Software Engineer", "Systems Analyst", "Technical Consultant"]
 
-        if DDGS is None:
+        if self.search_client is None:
             return ["Solution Architect", "Technical Lead", "Research Scientist"]
 
         try:
-            with DDGS() as ddgs:
-                query = f"top 3 career paths for someone with skills: {', '.join(detected_skills[:5])}"
-                results = list(ddgs.text(query, max_results=5))
-                
-                discovered = []
-                fallbacks = ["Solution Architect", "Technical Lead", "Research Scientist"]
-                
-                for r in results:
-                    body = r.get('body', '').lower()
-                    potential_roles = ["Data Scientist", "DevOps Engineer", "Cloud Architect", "Research Scientist", "Machine Learning Engineer", "Backend Developer", "Product Manager", "Full Stack Developer"]
-                    for role in potential_roles:
-                        if role.lower() in body and role not in discovered:
-                            discovered.append(role)
-                    if len(discovered) >= 3: break
-                
-                return discovered[:3] if len(discovered) >= 3 else (discovered + fallbacks)[:3]
+            discovered = list(self._cached_search(detected_skills))
         except Exception as e:
             print(f"Web discovery error: {e}")
-            return ["Career Specialist", "Systems Designer", "Technical Strategist"]
+            return list(self.WEB_FALLBACK_ROLES)
+
+        fallbacks = ["Solution Architect", "Technical Lead", "Research Scientist"]
+        return discovered[:3] if len(discovered) >= 3 else (discovered + fallbacks)[:3]
+
+    def _cached_search(self, detected_skills):
+        query = f"top 3 career paths for someone with skills: {', '.join(detected_skills[:5])}"
+        return self.web_cache.get_or_compute(
+            " ".join(query.lower().split()),
+            lambda: self._search_roles(query)
+        )
+
+    def _search_roles(self, query):
+        """Runs the live web search and picks known roles from the snippets."""
+        # Raises CircuitOpenError right away while the search provider is failing
+        results = self.search_provider.call(self._text_search, query)
+        
+        discovered = []
+        
+        for r in results:
+            body = r.get('body', '').lower()
+            potential_roles = ["Data Scientist", "DevOps Engineer", "Cloud Architect", "Research Scientist", "Machine Learning Engineer", "Backend Developer", "Product Manager", "Full Stack Developer"]
+            for role in potential_roles:
+                if role.lower() in body and role not in discovered:
+                    discovered.append(role)
+            if len(discovered) >= 3: break
+        
+        return tuple(discovered[:3])
 
-    def analyze_suitability(self, role, resume_text, predictor):
+    def _text_search(self, query):
+        try:
+            return list(self.search_clients.get().text(query, max_results=5))
+        except Exception:
+            # The client may hold broken connections: build a fresh one next time
+            self.search_clients.discard()
+            raise
+
+    def analyze_suitability(self, role, resume_text, predictor, confidence=None):
         """
         Analyzes suitability and returns a high-precision score + personalized reason.
+        confidence is the role classifier's probability for the role, if it knows it.
         """
-        resume_lower = resume_text.lower()
+        resume_lower = as_document(resume_text).lower
         role_lower = role.lower()
         role_words = [w for w in role_lower.split() if len(w) > 2]
         
@@ -129,8 +152,16 @@ class IntelligenceEngine:
         match_count = len(matches)
         density = (match_count / len(role_words)) if role_words else 0
         
-        # 2. Reason Generation
-        if match_count > 0:
+        # 2. Reason Generation (from the classifier's confidence when it ranked
+        # the role, so the reason always agrees with the score)
+        if confidence is not None:
+            if confidence >= self.STRONG_MATCH:
+                reason = f"Strong match: your skills and experience closely fit the {role} profile."
+            elif confidence >= self.PARTIAL_MATCH:
+                reason = f"Partial match: your profile covers part of what a {role} works with."
+            else:
+                reason = f"Identified as a growth path: a {role} needs skills your resume does not show yet."
+        elif match_count > 0:
             top_match = matches[0].capitalize()
             reason = f"Strong alignment with {role} core concepts like {top_match} found in your profile."
             if match_count > 1:
@@ -138,10 +169,13 @@ class IntelligenceEngine:
         else:
             reason = f"Identified as a growth path based on your overall technical competency."
 
-        # 3. Final Scoring
-        score = 0.45 + (density * 0.4)
-        import random
-        score += random.uniform(0.001, 0.005)
+        # 3. Final Scoring (the classifier's probability when it ranked the role)
+        if confidence is not None:
+            score = confidence
+        else:
+            score = 0.45 + (density * 0.4)
+            import random
+            score += random.uniform(0.001, 0.005)
         
         return {
             "score": min(score, 0.99),
@@ -152,22 +186,9 @@ class IntelligenceEngine:
         """
         Generates a trendy skill roadmap for the discovered role.
         """
-        # Dictionary of trendy skills for common roles
-        # In a real app, this would be fetched via web search or a larger KB
-        trendy_db = {
-            "Data Scientist": ["Machine Learning", "Deep Learning", "TensorFlow", "Pandas", "Statistics", "Data Visualization", "Big Data"],
-            "DevOps Engineer": ["Kubernetes", "Docker", "Terraform", "CI/CD", "AWS", "Prometheus", "Linux"],
-            "Cloud Architect": ["AWS", "Azure", "GCP", "Serverless", "Infrastructure as Code", "Networking", "Security"],
-            "Technical Lead": ["System Design", "Scalability", "Leadership", "Agile", "Microservices", "Cloud Native", "Mentorship"],
-            "Research Scientist": ["PyTorch", "NLP", "Deep Learning", "Publication Writing", "Mathematical Modeling", "Scientific Python"],
-            "Backend Developer": ["API Design", "Microservices", "PostgreSQL", "Redis", "Message Queues", "Caching Strategies", "GRPC"],
-            "Product Manager": ["Product Roadmap", "Stakeholder Management", "User Research", "Agile", "Market Analysis", "UX Design"],
-            "Solution Architect": ["System Architecture", "Security Compliance", "Cloud Migration", "Cost Optimization", "Integrations", "Technical Documentation"]
-        }
-        
-        # Default skills if role not explicitly in DB
-        base_skills = ["Advanced Architecture", "System Design", "Cloud Optimization", "Team Leadership", "Global Deployment"]
-        target_skills = trendy_db.get(role, base_skills)
+        # Role -> skill mappings (with a default set for unknown roles)
+        # come from the shared skill taxonomy in data/skill_taxonomy.json
+        target_skills = get_taxonomy().role_skills(role)
         
         roadmap = []
         detected_lower = [s.lower() for s in detected_skills]
@@ -194,11 +215,11 @@ class IntelligenceEngine:
         top_role = winner["role"]
         top_score = winner["score"]
         
-        # Skill-based narrowing
-        context_text = resume_text.lower()
+        # Skill-based narrowing (mentions, aliases included, from the one skill scan)
+        document = as_document(resume_text)
         skill_relevance = {}
         for skill in detected_skills:
-            skill_relevance[skill] = context_text.count(skill.lower())
+            skill_relevance[skill] = document.skill_count(skill)
 
         sorted_skills = sorted(skill_relevance, key=skill_relevance.get, reverse=True)
         top_skill = sorted_skills[0] if sorted_skills else ""
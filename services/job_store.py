@@ -0,0 +1,311 @@
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from services.skill_extractor import extract_skills
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATH = os.environ.get("JOB_POSTINGS_PATH", os.path.join(BASE_DIR, 'data', 'job_postings.db'))
+# Postings older than this (by posting date) are not suggested and are expired
+POSTING_TTL = float(os.environ.get("JOB_POSTINGS_TTL_DAYS", 30)) * 86400
+CHUNK_SIZE = 5000
+
+# Description text kept per posting (it is only used for matching)
+DESCRIPTION_CHARS = 5000
+
+# Columns tried, in order, for each posting field (JobSpy dumps included)
+FIELD_COLUMNS = {
+    "id": ["id", "job_id"],
+    "title": ["title", "job_title", "role"],
+    "company": ["company", "company_name"],
+    "url": ["url", "job_url", "link"],
+    "platform": ["platform", "site", "source"],
+    "location": ["location", "city"],
+    "description": ["description", "job_description", "skills"],
+    "posted_at": ["posted_at", "date_posted", "created_at"],
+}
+
+# Most recently ingested matches ranked per query. FTS5 streams matches in
+# rowid order cheaply, so this bounds the work on very common terms no
+# matter how many postings the store holds.
+CANDIDATES = int(os.environ.get("JOB_POSTINGS_CANDIDATES", 500))
+
+# A query/role word in the title counts this many shared skills
+TITLE_WEIGHT = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    title TEXT NOT NULL,
+    company TEXT,
+    url TEXT,
+    platform TEXT,
+    location TEXT,
+    description TEXT,
+    skills TEXT NOT NULL,
+    posted_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_posted_at ON postings (posted_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts USING fts5(
+    title, company, description, content='postings', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS postings_ai AFTER INSERT ON postings BEGIN
+    INSERT INTO postings_fts (rowid, title, company, description)
+    VALUES (new.rowid, new.title, new.company, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS postings_ad AFTER DELETE ON postings BEGIN
+    INSERT INTO postings_fts (postings_fts, rowid, title, company, description)
+    VALUES ('delete', old.rowid, old.title, old.company, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS postings_au AFTER UPDATE ON postings BEGIN
+    INSERT INTO postings_fts (postings_fts, rowid, title, company, description)
+    VALUES ('delete', old.rowid, old.title, old.company, old.description);
+    INSERT INTO postings_fts (rowid, title, company, description)
+    VALUES (new.rowid, new.title, new.company, new.description);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO postings (id, title, company, url, platform, location, description, skills, posted_at)
+VALUES (:id, :title, :company, :url, :platform, :location, :description, :skills, :posted_at)
+ON CONFLICT (id) DO UPDATE SET
+    title = excluded.title, company = excluded.company, url = excluded.url,
+    platform = excluded.platform, location = excluded.location,
+    description = excluded.description, skills = excluded.skills,
+    posted_at = excluded.posted_at
+"""
+
+_TERM = re.compile(r'\w+')
+
+
+def _terms(text):
+    # Same word split as the FTS5 unicode61 tokenizer; 1-letter words are noise
+    return [term for term in _TERM.findall(text.lower()) if len(term) > 1]
+
+
+def _match_any(terms):
+    return " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+
+def _timestamp(value, default):
+    if value in (None, ""):
+        return default
+    try:
+        number = float(value)
+        # Epoch milliseconds from some job board dumps
+        return number / 1000 if number > 1e11 else number
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return default
+
+
+def normalize_posting(record, now=None):
+    """
+    Maps a raw posting (JSON object or CSV row) onto the store's fields,
+    including the taxonomy skills it mentions. Returns None without a title.
+    """
+    now = time.time() if now is None else now
+    posting = {}
+    for field, columns in FIELD_COLUMNS.items():
+        value = next((record[c] for c in columns if record.get(c) not in (None, "")), None)
+        if isinstance(value, list):
+            value = " ".join(map(str, value))
+        posting[field] = value
+    if not posting["title"]:
+        return None
+
+    posting["title"] = str(posting["title"])
+    for field in ("company", "url", "platform", "location"):
+        posting[field] = str(posting[field]) if posting[field] is not None else None
+    posting["description"] = str(posting["description"] or "")[:DESCRIPTION_CHARS]
+    posting["posted_at"] = _timestamp(posting["posted_at"], now)
+    posting["skills"] = "|".join(extract_skills(posting["title"] + "\n" + posting["description"])).lower()
+    if not posting["id"]:
+        key = posting["url"] or "|".join(str(posting[f] or "") for f in ("title", "company", "location"))
+        posting["id"] = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    posting["id"] = str(posting["id"])
+    return posting
+
+
+def iter_postings(path, chunk_size=CHUNK_SIZE):
+    """Yields lists of raw posting dicts from a CSV, JSON Lines or JSON array file."""
+    if not path.lower().endswith('.csv'):
+        # The trainer pulls in scikit-learn; the API only searches the store
+        from services.streaming_trainer import iter_records
+        yield from iter_records(path, chunk_size)
+        return
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        chunk = []
+        for row in csv.DictReader(f):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class JobStore:
+    """
+    Local job postings with SQLite FTS5 full-text search.
+
+    Postings are upserted by id (so dumps can be re-ingested incrementally,
+    also while a server is reading the store) and never suggested once
+    older than ttl seconds; expire() deletes them.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=POSTING_TTL, candidates=CANDIDATES):
+        self.path = path
+        self.ttl = ttl
+        self.candidates = candidates
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            # WAL: searches keep running while another process ingests
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def ingest(self, records):
+        """Upserts raw posting dicts; returns how many were stored."""
+        now = time.time()
+        postings = [p for p in (normalize_posting(r, now) for r in records) if p is not None]
+        with self._lock:
+            self._db.executemany(_UPSERT, postings)
+            self._db.commit()
+        return len(postings)
+
+    def ingest_file(self, path, chunk_size=CHUNK_SIZE):
+        """Streams a dump into the store chunk by chunk."""
+        return sum(self.ingest(chunk) for chunk in iter_postings(path, chunk_size))
+
+    def expire(self, max_age=None):
+        """Deletes postings older than max_age seconds (default ttl)."""
+        cutoff = time.time() - (self.ttl if max_age is None else max_age)
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM postings WHERE posted_at < ?", (cutoff,)).rowcount
+            self._db.execute("INSERT INTO postings_fts (postings_fts) VALUES ('optimize')")
+            self._db.commit()
+        return deleted
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+    def search(self, query, skills=(), role=None, limit=5):
+        """
+        Best fresh postings for a super query and detected skills, as job
+        suggestion dicts. Postings whose title contains every word of role
+        come first; the rest of the list is filled from postings matching
+        any query or skill word. Within each step the `candidates` best fresh
+        matches by FTS5 rank (bm25) are scored by query/role words in the
+        title and skills shared with the resume (newer postings win ties).
+        """
+        terms = _terms(query) + [term for skill in skills for term in _terms(skill)]
+        role_terms = _terms(role or "")
+        if not terms and not role_terms:
+            return []
+        cutoff = time.time() - self.ttl
+        title_terms = set(_terms(query) + role_terms)
+        resume_skills = {skill.lower() for skill in skills}
+
+        expressions = []
+        if role_terms:
+            expressions.append("title : (" + " AND ".join(f'"{term}"' for term in dict.fromkeys(role_terms)) + ")")
+        if terms:
+            expressions.append(_match_any(terms))
+
+        found = []
+        seen = set()
+        for expression in expressions:
+            with self._lock:
+                # Stale postings are filtered before the limit, so they never
+                # crowd fresh ones out of the candidates
+                rows = self._db.execute(
+                    "SELECT p.posted_at, p.id, p.title, p.company, p.url, p.platform, p.skills "
+                    "FROM postings_fts f JOIN postings p ON p.rowid = f.rowid "
+                    "WHERE postings_fts MATCH ? AND p.posted_at >= ? "
+                    "ORDER BY bm25(postings_fts), p.posted_at DESC LIMIT ?",
+                    (expression, cutoff, self.candidates)
+                ).fetchall()
+
+            scored = []
+            for posted_at, posting_id, title, company, url, platform, posting_skills in rows:
+                if posting_id in seen:
+                    continue
+                score = TITLE_WEIGHT * len(title_terms.intersection(_terms(title)))
+                score += len(resume_skills.intersection(posting_skills.split("|")))
+                scored.append((score, posted_at, posting_id, title, company, url, platform))
+            scored.sort(reverse=True)
+
+            for _, _, posting_id, title, company, url, platform in scored[:limit - len(found)]:
+                seen.add(posting_id)
+                found.append({
+                    "title": title,
+                    "company": company or "Company",
+                    "url": url or "#",
+                    "platform": platform or "Job Board",
+                })
+            if len(found) >= limit:
+                break
+        return found
+
+
+def open_store(path=DEFAULT_PATH):
+    """The store at path if it has been created (by ingesting postings), else None."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return JobStore(path)
+    except sqlite3.Error as e:
+        print(f"Job postings store unavailable: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Manage the local job postings store.")
+    arg_parser.add_argument("--db", default=DEFAULT_PATH)
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest", help="Upsert postings from CSV / JSON / JSON Lines dumps")
+    ingest_parser.add_argument("files", nargs='+')
+    expire_parser = commands.add_parser("expire", help="Delete postings older than the TTL")
+    expire_parser.add_argument("--days", type=float)
+    search_parser = commands.add_parser("search", help="Rank postings for a query")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--role")
+    search_parser.add_argument("--skills", nargs='*', default=[])
+    search_parser.add_argument("-n", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    store = JobStore(args.db)
+    if args.command == "ingest":
+        for path in args.files:
+            started = time.time()
+            print(f"{path}: {store.ingest_file(path)} postings in {time.time() - started:.1f}s")
+        print(f"Store holds {store.count()} postings")
+    elif args.command == "expire":
+        max_age = args.days * 86400 if args.days is not None else None
+        print(f"Expired {store.expire(max_age)} postings; {store.count()} left")
+    else:
+        started = time.perf_counter()
+        results = store.search(args.query, args.skills, role=args.role, limit=args.n)
+        for job in results:
+            print(f"{job['title']} - {job['company']} ({job['platform']}) {job['url']}")
+        print(f"{len(results)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
@@ -0,0 +1,212 @@
+import hashlib
+import importlib.util
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from services.outbound import get_provider
+
+# JobSpy (and the pandas it brings along) is only imported by the first scrape
+SCRAPING_AVAILABLE = importlib.util.find_spec("jobspy") is not None
+
+_LISTING_COLUMNS = {
+    "title": ("title", "Job Opening"),
+    "company": ("company", "Company"),
+    "url": ("job_url", "#"),
+    "platform": ("site", "Job Board"),
+}
+
+
+def scrape_listings(query):
+    """Scrapes current openings for a query from the supported job boards."""
+    from jobspy import scrape_jobs
+    jobs = scrape_jobs(
+        site_name=["indeed", "linkedin", "google"],
+        search_term=query,
+        location="remote",
+        results_wanted=5,
+        hours_old=72,
+        country_indeed='USA'
+    )
+    if jobs is None or not hasattr(jobs, 'empty') or jobs.empty:
+        return []
+
+    # Column-wise conversion instead of iterrows()
+    frame = jobs.reindex(columns=[source for source, _ in _LISTING_COLUMNS.values()])
+    frame = frame.astype(object).where(frame.notna(), None)
+    listings = []
+    for record in frame.to_dict('records'):
+        listings.append({
+            field: str(record[source]) if record[source] is not None else default
+            for field, (source, default) in _LISTING_COLUMNS.items()
+        })
+    return listings
+
+
+def query_token(query):
+    """Stable token a client can poll for the listings of a query."""
+    return hashlib.sha1(" ".join(query.lower().split()).encode('utf-8')).hexdigest()[:16]
+
+
+class JobScrapeWorker:
+    """
+    Keeps job listings per search query fresh in the background.
+
+    lookup() never scrapes: it returns stored listings (scheduling a refresh
+    when they are stale) or queues the query and reports it as pending.
+    A single worker thread drains the queue, so each distinct query hits the
+    job boards at most once per refresh interval. Queries nobody asked for
+    within idle_ttl stop being refreshed and are eventually evicted.
+    """
+
+    def __init__(self, scrape=scrape_listings, refresh_interval=1800, idle_ttl=86400,
+                 max_queries=2048, path=None):
+        self.scrape = scrape
+        # Rate limit, retries and circuit breaker for the job boards
+        self.provider = get_provider("job_boards")
+        self.refresh_interval = refresh_interval
+        self.idle_ttl = idle_ttl
+        self.max_queries = max_queries
+        # token -> {"query", "status", "jobs", "updated_at", "requested_at"}
+        self._entries = OrderedDict()
+        self._queued = set()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS listings ("
+                "token TEXT PRIMARY KEY, query TEXT NOT NULL, "
+                "jobs TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            self._load()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="job-scraper", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def lookup(self, query):
+        """
+        Returns {"status": "ready"|"pending"|"failed", "token", "jobs"} for
+        a query without blocking on the network.
+        """
+        token = query_token(query)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                entry = {"query": query, "status": "pending", "jobs": [], "updated_at": 0, "requested_at": now}
+                self._entries[token] = entry
+                self._evict()
+            entry["requested_at"] = now
+            self._entries.move_to_end(token)
+            if now - entry["updated_at"] > self.refresh_interval:
+                self._enqueue(token)
+            return {"status": entry["status"], "token": token, "jobs": list(entry["jobs"])}
+
+    def poll(self, token):
+        """Returns the current state for a token, or None if unknown."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            return {"status": entry["status"], "token": token, "jobs": list(entry["jobs"])}
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "queued": len(self._queued)}
+
+    def _enqueue(self, token):
+        if token not in self._queued:
+            self._queued.add(token)
+            self._queue.put(token)
+
+    def _evict(self):
+        while len(self._entries) > self.max_queries:
+            self._entries.popitem(last=False)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                token = self._queue.get(timeout=60)
+            except queue.Empty:
+                self._schedule_refreshes()
+                continue
+            if token is None:
+                continue
+            with self._lock:
+                self._queued.discard(token)
+                entry = self._entries.get(token)
+                query = entry["query"] if entry else None
+            if query is not None:
+                self._refresh(token, query)
+
+    def _refresh(self, token, query):
+        try:
+            jobs = self.provider.call(self.scrape, query)
+        except Exception as e:
+            print(f"Scraping logic execution error: {e}")
+            jobs = None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return
+            if jobs is not None:
+                entry["jobs"] = jobs
+                entry["status"] = "ready"
+            elif not entry["jobs"]:
+                # Keep serving the previous listings if a refresh fails
+                entry["status"] = "failed"
+            entry["updated_at"] = now
+            if self._db is not None and jobs is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO listings (token, query, jobs, updated_at) VALUES (?, ?, ?, ?)",
+                    (token, query, json.dumps(jobs), now)
+                )
+                self._db.commit()
+
+    def _schedule_refreshes(self):
+        now = time.time()
+        with self._lock:
+            for token, entry in list(self._entries.items()):
+                if now - entry["requested_at"] > self.idle_ttl:
+                    del self._entries[token]
+                elif now - entry["updated_at"] > self.refresh_interval:
+                    self._enqueue(token)
+
+    def _load(self):
+        cutoff = time.time() - self.idle_ttl
+        rows = self._db.execute(
+            "SELECT token, query, jobs, updated_at FROM listings WHERE updated_at >= ? "
+            "ORDER BY updated_at DESC LIMIT ?",
+            (cutoff, self.max_queries)
+        ).fetchall()
+        for token, query, jobs, updated_at in reversed(rows):
+            self._entries[token] = {
+                "query": query,
+                "status": "ready",
+                "jobs": json.loads(jobs),
+                "updated_at": updated_at,
+                "requested_at": updated_at,
+            }
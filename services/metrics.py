@@ -0,0 +1,220 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds (from cache hits up to slow web calls)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics) with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # key -> [bucket counts..., sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield (self.name + "_bucket",
+                       _format_labels(self.labelnames, key, [("le", _format_value(bound))]), cumulative)
+            yield self.name + "_sum", _format_labels(self.labelnames, key), state[-1]
+            yield self.name + "_count", _format_labels(self.labelnames, key), cumulative
+
+
+class Registry:
+    """Metrics of this process, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = []
+        # Callbacks returning [(name, kind, help, {labels}, value), ...] at scrape time
+        self._collectors = []
+
+    def counter(self, name, help_text, labelnames=()):
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collect):
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+
+        # Samples of one metric must be contiguous: group them by name first
+        families = {}
+        for collect in self._collectors:
+            try:
+                samples = list(collect())
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+                continue
+            for name, kind, help_text, labels, value in samples:
+                family = families.setdefault(name, (kind, help_text, []))
+                family[2].append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        for name, (kind, help_text, samples) in families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "resume_stage_duration_seconds", "Time spent per analysis stage.", ["endpoint", "stage"])
+STAGE_ERRORS = REGISTRY.counter(
+    "resume_stage_errors_total", "Analysis stages that failed or timed out.", ["endpoint", "stage", "error"])
+HTTP_REQUESTS = REGISTRY.counter(
+    "resume_http_requests_total", "HTTP requests by route and status.", ["method", "route", "status"])
+HTTP_SECONDS = REGISTRY.histogram(
+    "resume_http_request_duration_seconds", "HTTP request latency by route.", ["method", "route"])
+EXTERNAL_CALLS = REGISTRY.counter(
+    "resume_external_calls_total", "Calls to external services by outcome.", ["service", "outcome"])
+EXTERNAL_SECONDS = REGISTRY.histogram(
+    "resume_external_call_duration_seconds", "Latency of external service calls.", ["service"])
+
+
+@contextmanager
+def external_call(service):
+    """Times a call to an external service and counts its outcome."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EXTERNAL_CALLS.inc(service=service, outcome="error")
+        raise
+    else:
+        EXTERNAL_CALLS.inc(service=service, outcome="ok")
+    finally:
+        EXTERNAL_SECONDS.observe(time.perf_counter() - started, service=service)
+
+
+class RequestTimings:
+    """
+    Stage durations of one request. Each stage is recorded in the shared
+    histograms and kept for the Server-Timing header / debug field.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    def record(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, endpoint=self.endpoint, stage=stage)
+
+    def error(self, stage, error):
+        STAGE_ERRORS.inc(endpoint=self.endpoint, stage=stage, error=error)
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.error(name, type(e).__name__)
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def timed(self, name, func):
+        """Wraps func so its run (e.g. in a worker thread) is recorded as a stage."""
+        def run(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+        return run
+
+    def finish(self):
+        self.record("total", time.perf_counter() - self.started)
+
+    def milliseconds(self):
+        return {stage: round(seconds * 1000, 2) for stage, seconds in self.stages.items()}
+
+    def server_timing(self):
+        """Value for the Server-Timing response header."""
+        return ", ".join(f"{stage};dur={ms}" for stage, ms in self.milliseconds().items())
+
+
+def render():
+    return REGISTRY.render()
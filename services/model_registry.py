@@ -0,0 +1,477 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from services import role_classifier, role_index
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BASE_DIR, 'model')
+DATA_PATH = os.path.join(BASE_DIR, 'data', 'job_roles.json')
+
+# Memory-mappable copy of the pickled artifacts (derived, rebuilt when stale):
+# arrays/<version>/ holds the .npy files and arrays/manifest.json names the
+# live directory, so a re-export never touches files other workers may map
+ARRAYS_DIRNAME = 'arrays'
+ARRAYS_FORMAT = 4
+# Array directories kept besides the live one (for workers still loading them)
+KEEP_ARRAYS = 1
+
+_SOURCES = ('tfidf.pkl', 'job_vectors.pkl')
+# Published with the model when present
+_OPTIONAL = (role_classifier.FILENAME,)
+
+# Versioned model bundles: model/bundles/<version>/ holds the pickles, the
+# role data they were trained on and their arrays; current.json names the
+# live one. Older bundles beyond MODEL_KEEP_BUNDLES are pruned on publish.
+CURRENT_PATH = os.path.join(MODEL_DIR, 'current.json')
+KEEP_BUNDLES = int(os.environ.get("MODEL_KEEP_BUNDLES", 3))
+
+
+class ArrayVectorizer:
+    """
+    TF-IDF transform backed by plain (memory-mapped) numpy arrays instead of
+    a pickled TfidfVectorizer and its per-process vocabulary dict.
+
+    Terms are stored sorted so lookups are a vectorized searchsorted; the
+    result matches TfidfVectorizer.transform for word unigrams with raw or
+    sublinear tf, idf weighting and l2 / no normalization.
+    """
+
+    def __init__(self, terms, term_columns, idf, params):
+        self.terms = terms
+        self.term_columns = term_columns
+        self.idf = idf
+        self.lowercase = params["lowercase"]
+        self.sublinear_tf = params["sublinear_tf"]
+        self.norm = params["norm"]
+        self._token_re = re.compile(params["token_pattern"])
+        self.n_features = len(idf)
+
+    def transform(self, documents):
+        data, indices, indptr = [], [], [0]
+        for doc in documents:
+            if self.lowercase:
+                doc = doc.lower()
+            tokens = self._token_re.findall(doc)
+            columns = np.array([], dtype=np.int32)
+            weights = np.array([], dtype=np.float64)
+            if tokens and len(self.terms):
+                tokens = np.array(tokens)
+                pos = np.searchsorted(self.terms, tokens)
+                pos[pos >= len(self.terms)] = 0
+                known = self.terms[pos] == tokens
+                columns, counts = np.unique(self.term_columns[pos[known]], return_counts=True)
+                tf = counts.astype(np.float64)
+                if self.sublinear_tf:
+                    tf = np.log(tf) + 1
+                weights = tf * self.idf[columns]
+                if self.norm == 'l2' and len(weights):
+                    weights /= np.sqrt(np.dot(weights, weights))
+            data.append(weights)
+            indices.append(columns)
+            indptr.append(indptr[-1] + len(columns))
+        return csr_matrix(
+            (
+                np.concatenate(data) if data else np.array([], dtype=np.float64),
+                np.concatenate(indices).astype(np.int32) if indices else np.array([], dtype=np.int32),
+                np.array(indptr, dtype=np.int32),
+            ),
+            shape=(len(documents), self.n_features)
+        )
+
+
+class ModelArtifacts:
+    """Everything JobPredictor needs, loaded once per process."""
+
+    def __init__(self, tfidf, job_vectors, job_roles, version, role_classifier=None, index_postings=None):
+        self.tfidf = tfidf
+        self.job_vectors = job_vectors
+        self.job_roles = job_roles
+        self.version = version
+        # Multi-label role classifier for offline role discovery (optional)
+        self.role_classifier = role_classifier
+        self.normalized = _unit_rows(job_vectors)
+        # Pruned inverted index for large corpora; small ones are scored exactly.
+        # Its postings come from the exported arrays when they match the settings.
+        self.index = None
+        if self.normalized and job_vectors.shape[0] >= role_index.MIN_ROWS:
+            self.index = role_index.RoleIndex(job_vectors, pruned=index_postings)
+
+
+def _unit_rows(job_vectors):
+    """True when every non-empty job row has unit l2 norm."""
+    norms = np.sqrt(np.asarray(job_vectors.multiply(job_vectors).sum(axis=1)).ravel())
+    return bool(np.allclose(norms[norms > 0], 1.0))
+
+
+def _supports_arrays(tfidf):
+    """Whether ArrayVectorizer can reproduce this vectorizer exactly."""
+    # Only needed when (re)exporting arrays; serving never imports scikit-learn
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    if not isinstance(tfidf, TfidfVectorizer):
+        return False
+    params = tfidf.get_params()
+    return (
+        params["analyzer"] == 'word'
+        and params["ngram_range"] == (1, 1)
+        and params["tokenizer"] is None
+        and params["preprocessor"] is None
+        and params["strip_accents"] is None
+        and not params["binary"]
+        and params["use_idf"]
+        and params["norm"] in ('l2', None)
+    )
+
+
+def _sources_version(blobs):
+    return hashlib.sha1(blobs['tfidf.pkl'] + blobs['job_vectors.pkl']).hexdigest()[:12]
+
+
+def source_version(model_dir=MODEL_DIR):
+    """Version of the pickled TF-IDF model in model_dir (as in its arrays manifest)."""
+    blobs = {}
+    for name in _SOURCES:
+        with open(os.path.join(model_dir, name), 'rb') as f:
+            blobs[name] = f.read()
+    return _sources_version(blobs)
+
+
+def _source_stamp(model_dir):
+    stamp = {}
+    for name in _SOURCES:
+        st = os.stat(os.path.join(model_dir, name))
+        stamp[name] = [st.st_size, st.st_mtime_ns]
+    return stamp
+
+
+def export_arrays(model_dir=MODEL_DIR):
+    """
+    Converts the pickled TF-IDF artifacts into .npy arrays in a new
+    model/arrays/<version>/ directory, then atomically points
+    model/arrays/manifest.json at it. The job matrix is always exported;
+    returns False when the vectorizer itself cannot be served from arrays
+    (its pickle is loaded instead, e.g. the hashing model of the streaming
+    trainer).
+    """
+    blobs = {}
+    for name in _SOURCES:
+        with open(os.path.join(model_dir, name), 'rb') as f:
+            blobs[name] = f.read()
+    tfidf = pickle.loads(blobs['tfidf.pkl'])
+    job_vectors = csr_matrix(pickle.loads(blobs['job_vectors.pkl']))
+
+    manifest = {
+        "format": ARRAYS_FORMAT,
+        "version": _sources_version(blobs),
+        "sources": _source_stamp(model_dir),
+        "shape": list(job_vectors.shape),
+    }
+    if not _supports_arrays(tfidf):
+        manifest["vectorizer"] = 'pickle'
+    else:
+        manifest["vectorizer"] = 'arrays'
+        params = tfidf.get_params()
+        manifest["params"] = {
+            "lowercase": params["lowercase"],
+            "token_pattern": params["token_pattern"],
+            "sublinear_tf": params["sublinear_tf"],
+            "norm": params["norm"],
+        }
+
+    arrays_dir = os.path.join(model_dir, ARRAYS_DIRNAME)
+    manifest["path"] = manifest["version"]
+    target = os.path.join(arrays_dir, manifest["path"])
+    # Unique per thread too: the watcher and request threads may both re-export
+    tmp_suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp_dir = f"{target}.{tmp_suffix}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    if manifest["vectorizer"] == 'arrays':
+        vocabulary = tfidf.vocabulary_
+        terms = np.array(sorted(vocabulary))
+        np.save(os.path.join(tmp_dir, 'terms.npy'), terms)
+        np.save(os.path.join(tmp_dir, 'term_columns.npy'), np.array([vocabulary[t] for t in terms], dtype=np.int32))
+        np.save(os.path.join(tmp_dir, 'idf.npy'), np.asarray(tfidf.idf_, dtype=np.float64))
+    np.save(os.path.join(tmp_dir, 'job_data.npy'), job_vectors.data.astype(np.float64))
+    # Same dtype for both index arrays, or scipy copies them on load
+    index_dtype = np.int64 if job_vectors.nnz > np.iinfo(np.int32).max else np.int32
+    np.save(os.path.join(tmp_dir, 'job_indices.npy'), job_vectors.indices.astype(index_dtype))
+    np.save(os.path.join(tmp_dir, 'job_indptr.npy'), job_vectors.indptr.astype(index_dtype))
+    # Role index postings, so large corpora are not pruned again in every process
+    if _unit_rows(job_vectors) and job_vectors.shape[0] >= role_index.MIN_ROWS:
+        pruned = role_index.prune_postings(job_vectors, role_index.MAX_POSTINGS)
+        np.save(os.path.join(tmp_dir, 'index_data.npy'), pruned.data.astype(np.float64))
+        np.save(os.path.join(tmp_dir, 'index_indices.npy'), pruned.indices.astype(index_dtype))
+        np.save(os.path.join(tmp_dir, 'index_indptr.npy'), pruned.indptr.astype(index_dtype))
+        manifest["index"] = {"max_postings": role_index.MAX_POSTINGS}
+    # Move the directory in; another worker may have exported the same
+    # version already (its files are identical)
+    if os.path.isdir(target):
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    else:
+        try:
+            os.replace(tmp_dir, target)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    tmp_path = os.path.join(arrays_dir, f"manifest.json.{tmp_suffix}")
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(arrays_dir, 'manifest.json'))
+
+    _prune_arrays(arrays_dir, manifest["path"])
+    return manifest["vectorizer"] == 'arrays'
+
+
+def _prune_arrays(arrays_dir, live):
+    # Older exports (and files of the flat format 2 layout); processes still
+    # mapping a removed directory keep their (unlinked) pages
+    entries = [n for n in os.listdir(arrays_dir) if n != 'manifest.json' and '.tmp' not in n]
+    for name in entries:
+        if name.endswith('.npy'):
+            os.remove(os.path.join(arrays_dir, name))
+    names = [n for n in entries if n != live and os.path.isdir(os.path.join(arrays_dir, n))]
+    names.sort(key=lambda n: os.path.getmtime(os.path.join(arrays_dir, n)), reverse=True)
+    for name in names[KEEP_ARRAYS:]:
+        shutil.rmtree(os.path.join(arrays_dir, name), ignore_errors=True)
+
+
+def _read_manifest(arrays_dir):
+    try:
+        with open(os.path.join(arrays_dir, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_artifacts(model_dir=MODEL_DIR, data_path=DATA_PATH, version=None):
+    """
+    Loads the model for this process. Arrays are memory-mapped read-only,
+    so every worker process shares the same page-cache pages.
+    """
+    arrays_dir = os.path.join(model_dir, ARRAYS_DIRNAME)
+    manifest = _read_manifest(arrays_dir)
+    if manifest is None or manifest.get("format") != ARRAYS_FORMAT \
+            or manifest.get("sources") != _source_stamp(model_dir):
+        export_arrays(model_dir)
+        manifest = _read_manifest(arrays_dir)
+
+    with open(data_path, 'r') as f:
+        job_roles = json.load(f)
+
+    def mapped(name):
+        return np.load(os.path.join(arrays_dir, manifest["path"], name), mmap_mode='r')
+
+    if manifest["vectorizer"] == 'arrays':
+        tfidf = ArrayVectorizer(mapped('terms.npy'), mapped('term_columns.npy'), mapped('idf.npy'), manifest["params"])
+    else:
+        with open(os.path.join(model_dir, 'tfidf.pkl'), 'rb') as f:
+            tfidf = pickle.load(f)
+    job_vectors = csr_matrix(
+        (mapped('job_data.npy'), mapped('job_indices.npy'), mapped('job_indptr.npy')),
+        shape=tuple(manifest["shape"]),
+        copy=False
+    )
+    # Exported with other settings (ROLE_INDEX_MAX_POSTINGS): pruned on load instead
+    index_postings = None
+    if manifest.get("index", {}).get("max_postings") == role_index.MAX_POSTINGS:
+        index_postings = csr_matrix(
+            (mapped('index_data.npy'), mapped('index_indices.npy'), mapped('index_indptr.npy')),
+            shape=tuple(manifest["shape"]),
+            copy=False
+        )
+    # The role classifier is only valid for the TF-IDF model it was trained on
+    classifier = role_classifier.load_for_model(model_dir, manifest["version"])
+    return ModelArtifacts(tfidf, job_vectors, job_roles, version or manifest["version"], classifier, index_postings)
+
+
+def read_current():
+    """Returns the live bundle manifest from current.json, or None."""
+    try:
+        with open(CURRENT_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def publish_bundle(model_dir=MODEL_DIR, data_path=DATA_PATH, keep=KEEP_BUNDLES):
+    """
+    Snapshots the trained pickles, role classifier and role data into a new
+    bundle under model_dir/bundles, exports its arrays and atomically points
+    model_dir/current.json at it. Running servers (serving model/) pick it
+    up through reload_model(). Returns the new manifest.
+    """
+    optional = [name for name in _OPTIONAL if os.path.exists(os.path.join(model_dir, name))]
+    sources = [os.path.join(model_dir, name) for name in _SOURCES + tuple(optional)] + [data_path]
+    digest = hashlib.sha1()
+    for path in sources:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    version = digest.hexdigest()[:12]
+
+    bundles_dir = os.path.join(model_dir, 'bundles')
+    current_path = os.path.join(model_dir, 'current.json')
+    bundle = os.path.join(bundles_dir, version)
+    if not os.path.isdir(bundle):
+        tmp_dir = f"{bundle}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        for name in _SOURCES + tuple(optional):
+            shutil.copy2(os.path.join(model_dir, name), os.path.join(tmp_dir, name))
+        shutil.copy2(data_path, os.path.join(tmp_dir, 'job_roles.json'))
+        export_arrays(tmp_dir)
+        try:
+            os.replace(tmp_dir, bundle)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    manifest = {"version": version, "path": os.path.relpath(bundle, model_dir), "published_at": time.time()}
+    tmp_path = f"{current_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, current_path)
+
+    _prune_bundles(bundles_dir, version, keep)
+    return manifest
+
+
+def _prune_bundles(bundles_dir, current_version, keep):
+    # Processes still mapping a removed bundle keep their (unlinked) pages
+    try:
+        names = [n for n in os.listdir(bundles_dir) if not n.endswith('.tmp')]
+    except OSError:
+        return
+    names.sort(key=lambda n: os.path.getmtime(os.path.join(bundles_dir, n)), reverse=True)
+    old = [n for n in names if n != current_version][max(keep - 1, 0):]
+    for name in old:
+        shutil.rmtree(os.path.join(bundles_dir, name), ignore_errors=True)
+
+
+def load_current():
+    """
+    Loads the bundle named by current.json, or the legacy model/*.pkl
+    files when nothing has been published yet.
+    """
+    current = read_current()
+    if current is not None:
+        bundle = os.path.join(MODEL_DIR, current["path"])
+        if os.path.isdir(bundle):
+            return load_artifacts(bundle, os.path.join(bundle, 'job_roles.json'), current["version"])
+        print(f"Model bundle {current['path']} is missing; using model/*.pkl")
+    return load_artifacts()
+
+
+_artifacts = None
+_predictor = None
+_lock = threading.RLock()
+_reload_lock = threading.Lock()
+
+
+def get_artifacts():
+    """Returns the process-wide model artifacts, loading them on first use."""
+    global _artifacts
+    if _artifacts is None:
+        with _lock:
+            if _artifacts is None:
+                _artifacts = load_current()
+    return _artifacts
+
+
+def current_version():
+    """Version of the model serving requests in this process."""
+    return _artifacts.version if _artifacts is not None else None
+
+
+def reload_model(force=False):
+    """
+    Loads the published bundle if it differs from the live one and swaps
+    it into the shared predictor in a single reference assignment.
+    Requests keep using the old model until the new one is fully loaded,
+    and a failed load leaves the old one in place.
+    Returns {"version", "previous", "reloaded"}.
+    """
+    global _artifacts
+    with _reload_lock:
+        previous = current_version()
+        current = read_current()
+        if not force and current is not None and current["version"] == previous:
+            return {"version": previous, "previous": previous, "reloaded": False}
+
+        artifacts = load_current()
+        with _lock:
+            _artifacts = artifacts
+            if _predictor is not None:
+                _predictor.swap(artifacts)
+        print(f"Model reloaded: {previous} -> {artifacts.version}")
+        return {"version": artifacts.version, "previous": previous, "reloaded": True}
+
+
+class ModelWatcher:
+    """
+    Polls current.json and hot-reloads the model when a new bundle is
+    published, so every worker process follows a retrain without restarts.
+    """
+
+    def __init__(self, interval=30):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._seen = None
+
+    def start(self):
+        if self._thread is None and self.interval > 0:
+            self._seen = self._stamp()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _stamp(self):
+        try:
+            return os.stat(CURRENT_PATH).st_mtime_ns
+        except OSError:
+            return None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stamp = self._stamp()
+            if stamp == self._seen:
+                continue
+            try:
+                reload_model()
+                self._seen = stamp
+            except Exception as e:
+                print(f"Model reload failed: {e}")
+
+
+def get_predictor():
+    """Process-wide JobPredictor shared by the API and the Streamlit app."""
+    global _predictor
+    if _predictor is None:
+        from services.predictor import JobPredictor
+        with _lock:
+            if _predictor is None:
+                _predictor = JobPredictor()
+    return _predictor
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] == ['publish']:
+        manifest = publish_bundle()
+        print(f"✅ Published model bundle {manifest['version']} ({manifest['path']})")
+    else:
+        export_arrays()
+        print(f"✅ Exported memory-mapped model arrays to {os.path.join(MODEL_DIR, ARRAYS_DIRNAME)}")
@@ -0,0 +1,205 @@
+import os
+import random
+import threading
+import time
+
+from services import metrics
+
+# Per provider: sustained calls per second, burst size, retries per call and
+# (for background callers) how long to wait for a rate-limit token
+PROVIDERS = {
+    "duckduckgo": {
+        "rate": float(os.environ.get("WEB_SEARCH_RATE", 1.0)),
+        "burst": int(os.environ.get("WEB_SEARCH_BURST", 3)),
+        "retries": int(os.environ.get("WEB_SEARCH_RETRIES", 2)),
+    },
+    "job_boards": {
+        "rate": float(os.environ.get("JOB_BOARD_RATE", 0.2)),
+        "burst": int(os.environ.get("JOB_BOARD_BURST", 2)),
+        "retries": int(os.environ.get("JOB_BOARD_RETRIES", 1)),
+        "max_wait": 60.0,
+    },
+}
+
+# Consecutive failed calls that open a provider's circuit, and how long it
+# stays open before one trial call is let through
+BREAKER_FAILURES = int(os.environ.get("OUTBOUND_BREAKER_FAILURES", 5))
+BREAKER_RESET = float(os.environ.get("OUTBOUND_BREAKER_RESET", 30))
+
+# Longest wait for a rate-limit token before giving up on a request-path call
+MAX_WAIT = float(os.environ.get("OUTBOUND_MAX_WAIT", 2.0))
+
+# Exponential backoff between retries (full jitter)
+BACKOFF_BASE = 0.25
+BACKOFF_MAX = 2.0
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider is considered unhealthy; use the fallback."""
+
+
+class RateLimitedError(RuntimeError):
+    """No rate-limit token became available within the allowed wait."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `burst` saved."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=MAX_WAIT):
+        """Takes a token, waiting up to timeout seconds. Returns False if none came."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else timeout
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failures` consecutive failures; open -> half-open
+    after `reset` seconds, when a single trial call decides whether it
+    closes again or re-opens.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failures=BREAKER_FAILURES, reset=BREAKER_RESET):
+        self.failures = failures
+        self.reset = reset
+        self.state = self.CLOSED
+        self._failed = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset:
+                self.state = self.HALF_OPEN
+                self._trial = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failed = 0
+            self._trial = False
+
+    def release(self):
+        """Gives back a half-open trial that never reached the provider."""
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failed += 1
+            if self.state == self.HALF_OPEN or self._failed >= self.failures:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+
+class Provider:
+    """
+    Guarded outbound calls to one external service: rate limit, retries
+    with jittered exponential backoff, and a circuit breaker. Every attempt
+    is timed in the external call metrics.
+    """
+
+    def __init__(self, name, rate=1.0, burst=1, retries=0, breaker=None, max_wait=MAX_WAIT):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.breaker = breaker or CircuitBreaker()
+        self.max_wait = max_wait
+
+    def call(self, func, *args, **kwargs):
+        """
+        Runs func(*args, **kwargs). Raises CircuitOpenError without calling
+        it while the provider is unhealthy, RateLimitedError when the rate
+        limit does not free up in time, else the last error after retries.
+        """
+        if not self.breaker.allow():
+            metrics.EXTERNAL_CALLS.inc(service=self.name, outcome="circuit_open")
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+
+        for attempt in range(self.retries + 1):
+            if not self.bucket.acquire(self.max_wait):
+                metrics.EXTERNAL_CALLS.inc(service=self.name, outcome="rate_limited")
+                # Not the provider's fault: the breaker state is left as is
+                self.breaker.release()
+                raise RateLimitedError(f"{self.name} rate limit exceeded")
+            try:
+                with metrics.external_call(self.name):
+                    result = func(*args, **kwargs)
+            except Exception:
+                if attempt >= self.retries:
+                    self.breaker.record_failure()
+                    raise
+                time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)))
+            else:
+                self.breaker.record_success()
+                return result
+
+    def stats(self):
+        return {"state": self.breaker.state}
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name):
+    """Process-wide Provider for a service (settings from PROVIDERS)."""
+    with _providers_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            provider = _providers[name] = Provider(name, **PROVIDERS.get(name, {}))
+        return provider
+
+
+def provider_stats():
+    with _providers_lock:
+        return {name: provider.stats() for name, provider in _providers.items()}
+
+
+class ClientPool:
+    """
+    One long-lived client per thread, built by factory() on first use, so
+    connections (and their keep-alive pools) are reused across requests
+    without sharing a client between threads.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._local = threading.local()
+
+    def get(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.factory()
+        return client
+
+    def discard(self):
+        """Drops this thread's client (e.g. after a connection error)."""
+        self._local.client = None
@@ -1,5 +1,42 @@
-import pdfplumber
-import docx
+import codecs
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+# Guards against oversized uploads (all overridable via environment)
+MAX_BYTES = int(os.environ.get("PARSER_MAX_BYTES", 20 * 1024 * 1024))
+MAX_PAGES = int(os.environ.get("PARSER_MAX_PAGES", 100))
+MAX_CHARS = int(os.environ.get("PARSER_MAX_CHARS", 500_000))
+
+# Long PDFs can be split across processes. Off by default because the API
+# already parses each upload in its own worker process.
+PAGE_WORKERS = int(os.environ.get("PARSER_PAGE_WORKERS", 1))
+PARALLEL_MIN_PAGES = 16
+
+# PDF backend: "auto" reads simple single-column pages straight from the
+# text layer and keeps the geometry-aware word grouping for multi-column or
+# tabular pages; "fast" / "layout" force one backend for every page.
+PDF_BACKEND = os.environ.get("PARSER_PDF_BACKEND", "auto")
+
+_TXT_BLOCK = 64 * 1024
+
+# The PDF / DOCX libraries are imported on first use, so a process that
+# only sees TXT uploads (or never parses) does not pay for them.
+def _pdfium():
+    """Raw text-layer backend for simple pages (ships with pdfplumber), or None."""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None
+    return pdfium
+
+def load_backends():
+    """Imports every parsing backend now (e.g. before worker processes fork)."""
+    import pdfplumber
+    import docx
+    _pdfium()
 
 def extract_text(file_obj, file_type):
     """
@@ -12,41 +49,232 @@ def extract_text(file_obj, file_type):
     Returns:
         str: Extracted text
     """
+    return extract_text_with_report(file_obj, file_type)[0]
+
+def extract_text_with_report(file_obj, file_type, backend=None):
+    """
+    Like extract_text, but also returns a decision record for the document:
+    requested backend, pages read with the fast text-layer path vs. the
+    layout path, and extraction time in seconds.
+    """
+    report = {
+        "file_type": file_type,
+        "backend": backend or PDF_BACKEND,
+        "pages": 0,
+        "fast_pages": 0,
+        "layout_pages": 0,
+    }
+    start = time.perf_counter()
     try:
-        if file_type == 'pdf':
-            return _extract_from_pdf(file_obj)
-        elif file_type == 'docx':
-            return _extract_from_docx(file_obj)
-        elif file_type == 'txt':
-            return str(file_obj.read(), 'utf-8')
-        else:
-            return ""
+        text = "".join(iter_text(file_obj, file_type, backend=backend, report=report))
     except Exception as e:
         print(f"Error extracting text: {e}")
-        return ""
+        report["error"] = str(e)
+        text = ""
+    report["seconds"] = round(time.perf_counter() - start, 4)
+    return text, report
+
+def extract_text_from_bytes(data, file_type):
+    """
+    Extracts text from raw upload bytes. Picklable entry point so parsing
+    can run in a worker process.
+    """
+    return extract_text(io.BytesIO(data), file_type)
+
+def extract_text_report_from_bytes(data, file_type):
+    """Picklable extract_text_with_report for raw upload bytes."""
+    return extract_text_with_report(io.BytesIO(data), file_type)
+
+def iter_text(file_obj, file_type, max_pages=None, max_chars=None, workers=None, backend=None, report=None):
+    """
+    Streams the text of a file chunk by chunk (one chunk per PDF page) so
+    consumers such as clean_text / skill extraction can work incrementally.
+    Concatenating the chunks gives the same text as extract_text.
+
+    Stops after max_pages pages / max_chars characters (setting
+    report["truncated"] to "pages" / "chars") and raises ValueError for
+    files larger than MAX_BYTES. backend selects the PDF backend (default
+    PDF_BACKEND); per-page decisions are counted into report.
+    """
+    max_chars = MAX_CHARS if max_chars is None else max_chars
+    if _size(file_obj) > MAX_BYTES:
+        raise ValueError(f"File exceeds {MAX_BYTES} bytes")
+
+    if file_type == 'pdf':
+        chunks = _iter_pdf_pages(
+            file_obj,
+            MAX_PAGES if max_pages is None else max_pages,
+            workers or PAGE_WORKERS,
+            backend or PDF_BACKEND,
+            report if report is not None else {}
+        )
+    elif file_type == 'docx':
+        chunks = _iter_docx(file_obj)
+    elif file_type == 'txt':
+        chunks = _iter_txt(file_obj)
+    else:
+        return
+
+    remaining = max_chars
+    for chunk in chunks:
+        if len(chunk) >= remaining:
+            if len(chunk) > remaining and report is not None:
+                report["truncated"] = "chars"
+            yield chunk[:remaining]
+            chunks.close()
+            return
+        remaining -= len(chunk)
+        yield chunk
+
+def _size(file_obj):
+    """Size of a seekable file object (0 if it cannot be determined)."""
+    try:
+        position = file_obj.tell()
+        file_obj.seek(0, os.SEEK_END)
+        size = file_obj.tell()
+        file_obj.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return 0
+
+def _page_text(page):
+    # High-fidelity word extraction: looks at physical character gaps
+    words = page.extract_words(x_tolerance=3, y_tolerance=3, keep_blank_chars=False)
+    
+    # Group words by line (y-coordinate) to maintain structure
+    lines = {}
+    for w in words:
+        y = round(w['top'], 1)
+        if y not in lines:
+            lines[y] = []
+        lines[y].append(w['text'])
+    
+    # Join words with spaces and lines with newlines
+    sorted_y = sorted(lines.keys())
+    return "\n".join([" ".join(lines[y]) for y in sorted_y]) + "\n\n"
+
+def _extract_page_range(data, start, stop):
+    """Worker-process entry point: text of pages [start, stop)."""
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        texts = []
+        for page in pdf.pages[start:stop]:
+            texts.append(_page_text(page))
+            page.close()
+        return texts
+
+def _is_simple_layout(textpage, page_width):
+    """
+    Heuristic: a page is simple (single column, no tables) unless several
+    text runs sit side by side on the same line band, separated by a wide
+    horizontal gap.
+    """
+    rects = [textpage.get_rect(i) for i in range(textpage.count_rects())]
+    if len(rects) < 2:
+        return True
+
+    # Sweep runs from the top of the page down (rects are left, bottom, right, top)
+    rects.sort(key=lambda r: (-r[3], r[0]))
+    min_gap = page_width * 0.025
+    side_by_side = 0
+    for i, (left, bottom, right, top) in enumerate(rects):
+        for other in rects[i + 1:]:
+            if other[3] <= bottom:
+                break
+            if other[0] - right > min_gap or left - other[2] > min_gap:
+                side_by_side += 1
+    return side_by_side < max(2, 0.1 * len(rects))
+
+def _fast_page_text(textpage):
+    text = textpage.get_text_range().replace('\r\n', '\n').replace('\r', '\n')
+    return "\n".join(line.strip() for line in text.split('\n') if line.strip()) + "\n\n"
+
+def _iter_pdf_pages(file_obj, max_pages, workers, backend, report):
+    if backend != "layout" and _pdfium() is not None:
+        yield from _iter_pdf_pages_auto(file_obj, max_pages, backend, report)
+        return
+
+    import pdfplumber
 
-def _extract_from_pdf(file_obj):
-    text = ""
     with pdfplumber.open(file_obj) as pdf:
-        for page in pdf.pages:
-            # High-fidelity word extraction: looks at physical character gaps
-            words = page.extract_words(x_tolerance=3, y_tolerance=3, keep_blank_chars=False)
-            
-            # Group words by line (y-coordinate) to maintain structure
-            lines = {}
-            for w in words:
-                y = round(w['top'], 1)
-                if y not in lines:
-                    lines[y] = []
-                lines[y].append(w['text'])
-            
-            # Join words with spaces and lines with newlines
-            sorted_y = sorted(lines.keys())
-            page_text = "\n".join([" ".join(lines[y]) for y in sorted_y])
-            text += page_text + "\n\n"
-    return text
-
-def _extract_from_docx(file_obj):
+        page_count = min(len(pdf.pages), max_pages)
+        if len(pdf.pages) > max_pages:
+            report["truncated"] = "pages"
+        if workers <= 1 or page_count < PARALLEL_MIN_PAGES:
+            for page in pdf.pages[:page_count]:
+                report["pages"] = report.get("pages", 0) + 1
+                report["layout_pages"] = report.get("layout_pages", 0) + 1
+                yield _page_text(page)
+                # Drop cached layout objects so memory stays per-page
+                page.close()
+            return
+
+    # Fan contiguous page ranges out to worker processes; map() keeps order
+    file_obj.seek(0)
+    data = file_obj.read()
+    step = -(-page_count // (workers * 2))
+    starts = list(range(0, page_count, step))
+    stops = [min(start + step, page_count) for start in starts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for texts in pool.map(_extract_page_range, repeat(data), starts, stops):
+            report["pages"] = report.get("pages", 0) + len(texts)
+            report["layout_pages"] = report.get("layout_pages", 0) + len(texts)
+            yield from texts
+
+def _iter_pdf_pages_auto(file_obj, max_pages, backend, report):
+    """
+    Per-page backend selection: raw text layer (pdfium) for simple pages,
+    pdfplumber word grouping only for pages that need it.
+    """
+    file_obj.seek(0)
+    data = file_obj.read()
+    doc = _pdfium().PdfDocument(data)
+    layout_pdf = None
+    if len(doc) > max_pages:
+        report["truncated"] = "pages"
+    try:
+        for i in range(min(len(doc), max_pages)):
+            page = doc[i]
+            textpage = page.get_textpage()
+            try:
+                if backend == "fast" or _is_simple_layout(textpage, page.get_width()):
+                    text = _fast_page_text(textpage)
+                    kind = "fast_pages"
+                else:
+                    if layout_pdf is None:
+                        import pdfplumber
+                        layout_pdf = pdfplumber.open(io.BytesIO(data))
+                    layout_page = layout_pdf.pages[i]
+                    text = _page_text(layout_page)
+                    layout_page.close()
+                    kind = "layout_pages"
+            finally:
+                textpage.close()
+                page.close()
+            report["pages"] = report.get("pages", 0) + 1
+            report[kind] = report.get(kind, 0) + 1
+            yield text
+    finally:
+        if layout_pdf is not None:
+            layout_pdf.close()
+        doc.close()
+
+def _iter_docx(file_obj):
+    import docx
     doc = docx.Document(file_obj)
-    text = "\n".join([para.text for para in doc.paragraphs])
-    return text
+    for i, para in enumerate(doc.paragraphs):
+        yield para.text if i == 0 else "\n" + para.text
+
+def _iter_txt(file_obj):
+    # Incremental decoding so multi-byte characters split across blocks survive
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while True:
+        block = file_obj.read(_TXT_BLOCK)
+        if not block:
+            break
+        text = decoder.decode(block)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
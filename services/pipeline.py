@@ -0,0 +1,132 @@
+import asyncio
+from contextlib import nullcontext
+
+from services import executors
+
+
+class Stage:
+    """
+    One step of a Pipeline: func(*inputs) computes the named outputs.
+
+    A single output is the return value itself; several outputs are
+    returned as a tuple (in order) or a dict keyed by output name.
+    Coroutine functions are awaited; plain functions run according to
+    `run`: "inline" on the event loop (cheap steps), "thread" or "process"
+    in the shared executors, bounded by the `timeout` stage's limit.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), run="inline", timeout=None):
+        if run not in ("inline", "thread", "process"):
+            raise ValueError(f"Unknown run mode for stage {name!r}: {run!r}")
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs) or (name,)
+        self.run = run
+        self.timeout = timeout or name
+
+    def unpack(self, value):
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: value}
+        if isinstance(value, dict):
+            return {field: value[field] for field in self.outputs}
+        return dict(zip(self.outputs, value))
+
+    async def execute(self, args, timings=None):
+        """Runs the stage on args, recording its duration in timings (if given)."""
+        if self.run == "thread" and not asyncio.iscoroutinefunction(self.func):
+            # Timed inside the worker: waiting for a free thread is not stage time
+            func = timings.timed(self.name, self.func) if timings is not None else self.func
+            return await executors.run_in_thread(self.timeout, func, *args)
+        with timings.stage(self.name) if timings is not None else nullcontext():
+            if asyncio.iscoroutinefunction(self.func):
+                return await self.func(*args)
+            if self.run == "process":
+                return await executors.run_in_process(self.timeout, self.func, *args)
+            return self.func(*args)
+
+
+class Pipeline:
+    """
+    A DAG of stages wired by field names. Only the stages needed for the
+    requested fields run, each as soon as its inputs exist, so independent
+    stages overlap. Every stage is timed under its own name.
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self.producers = {}
+        for stage in self.stages:
+            for field in stage.outputs:
+                if field in self.producers:
+                    raise ValueError(f"Field {field!r} is produced by both {self.producers[field].name!r} and {stage.name!r}")
+                self.producers[field] = stage
+
+    @property
+    def fields(self):
+        return list(self.producers)
+
+    def plan(self, fields, available=()):
+        """
+        Stages needed to compute fields given the available ones, in a
+        valid execution order. Raises KeyError for a field nothing produces.
+        """
+        planned = []
+        seen = set()
+
+        def visit(field, path):
+            if field in available:
+                return
+            stage = self.producers.get(field)
+            if stage is None:
+                raise KeyError(f"No stage produces {field!r}")
+            if stage.name in seen:
+                return
+            if stage.name in path:
+                raise ValueError(f"Stage {stage.name!r} depends on itself")
+            for dependency in stage.inputs:
+                visit(dependency, path | {stage.name})
+            seen.add(stage.name)
+            planned.append(stage)
+
+        for field in fields:
+            visit(field, frozenset())
+        return planned
+
+    async def run(self, inputs, fields=None, timings=None):
+        """
+        Computes fields (default: all) from the inputs dict, yielding
+        (stage name, {output: value}) as each stage finishes. Fields already
+        in inputs are not recomputed. A stage's exception propagates and
+        cancels the stages still running.
+        """
+        values = dict(inputs)
+        pending = self.plan(self.fields if fields is None else fields, values)
+        running = {}
+        try:
+            while pending or running:
+                for stage in [s for s in pending if all(f in values for f in s.inputs)]:
+                    pending.remove(stage)
+                    args = [values[f] for f in stage.inputs]
+                    running[asyncio.ensure_future(stage.execute(args, timings))] = stage
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                # Stages finishing together are reported in declaration order
+                for task in sorted(done, key=lambda t: self.stages.index(running[t])):
+                    stage = running.pop(task)
+                    outputs = stage.unpack(task.result())
+                    values.update(outputs)
+                    yield stage.name, outputs
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def compute(self, inputs, fields=None, timings=None):
+        """Runs the pipeline to completion; returns inputs plus every computed field."""
+        values = dict(inputs)
+        async for _, outputs in self.run(inputs, fields, timings):
+            values.update(outputs)
+        return values
+
+    def compute_sync(self, inputs, fields=None, timings=None):
+        """compute() for callers without an event loop (e.g. Streamlit)."""
+        return asyncio.run(self.compute(inputs, fields, timings))
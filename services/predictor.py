@@ -1,38 +1,54 @@
-import pickle
-from sklearn.metrics.pairwise import cosine_similarity
-from services.cleaner import clean_text
-import json
-import os
-import numpy as np
+from services import model_registry
+from services.role_index import top_k as _top_k
+from services.document import as_document
 
 class JobPredictor:
     def __init__(self):
-        self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.tfidf_path = os.path.join(self.base_dir, 'model', 'tfidf.pkl')
-        self.vectors_path = os.path.join(self.base_dir, 'model', 'job_vectors.pkl')
-        self.data_path = os.path.join(self.base_dir, 'data', 'job_roles.json')
-        self.tfidf = None
-        self.job_vectors = None
-        self.job_roles = None
-        self._load_models()
+        # tfidf, job_vectors, job_roles and version always travel together
+        # so a hot reload can swap them in one assignment. They are loaded on
+        # first use (or by the server warm-up), not when the predictor is built.
+        self.artifacts = None
 
     def _load_models(self):
-        """Loads the trained models and data from disk."""
+        """
+        Attaches the trained models. They are loaded (memory-mapped) once per
+        process by services.model_registry and shared by every predictor.
+        """
         try:
-            with open(self.tfidf_path, 'rb') as f:
-                self.tfidf = pickle.load(f)
-            with open(self.vectors_path, 'rb') as f:
-                self.job_vectors = pickle.load(f)
-            with open(self.data_path, 'r') as f:
-                self.job_roles = json.load(f)
-            return True
+            self.artifacts = model_registry.get_artifacts()
         except FileNotFoundError:
             return False
+        return True
+
+    def swap(self, artifacts):
+        """Switches to newly loaded artifacts; in-flight predictions finish on the old ones."""
+        self.artifacts = artifacts
+
+    @property
+    def tfidf(self):
+        return self.artifacts.tfidf if self.artifacts else None
+
+    @property
+    def job_vectors(self):
+        return self.artifacts.job_vectors if self.artifacts else None
+
+    @property
+    def job_roles(self):
+        return self.artifacts.job_roles if self.artifacts else None
+
+    @property
+    def version(self):
+        # Fingerprint of the loaded artifacts (used to key cached results)
+        if self.artifacts is None:
+            self._load_models()
+        return self.artifacts.version if self.artifacts else None
 
     def calculate_ats_score(self, text):
         """
         Calculates a heuristic ATS score (0-100) based on content.
+        Accepts plain text or a ResumeDocument.
         """
+        document = as_document(text)
         score = 0
         checks = {
             "contact": ["phone", "email", "address", "linkedin", "github"],
@@ -42,7 +58,7 @@ class JobPredictor:
             "projects": ["projects", "personal", "github", "portfolio"]
         }
         
-        lower_text = text.lower()
+        lower_text = document.lower
         
         # 1. Section Presence (50 points)
         for section, keywords in checks.items():
@@ -50,7 +66,7 @@ class JobPredictor:
                 score += 10
                 
         # 2. Length/Detail Check (20 points)
-        word_count = len(text.split())
+        word_count = len(document.tokens)
         if 200 < word_count < 1500:
             score += 20
         elif word_count > 100:
@@ -59,51 +75,112 @@ class JobPredictor:
         # 3. Formatting/Consistency (30 points)
         # Check for common bullet point characters
         bullets = ['•', '·', '-', '*']
-        if any(b in text for b in bullets):
+        if any(b in document.text for b in bullets):
             score += 15
         
         # Check for year patterns (indicates chronological experience)
-        import re
-        years = re.findall(r'\b(20\d{2}|19\d{2})\b', text)
-        if len(years) >= 2:
+        if len(document.years) >= 2:
             score += 15
             
         return min(score, 100)
 
+    def rank_roles(self, resume_text, detected_skills=None, top_n=None):
+        """
+        Ranks roles with the model's multi-label role classifier, offline:
+        [{"role", "score"}] best first, score being the role's probability
+        (every role the classifier knows when top_n is None).
+        Empty when the loaded model has no role classifier.
+        """
+        if self.artifacts is None and not self._load_models():
+            return []
+        model = self.artifacts
+        if model.role_classifier is None:
+            return []
+
+        document = as_document(resume_text)
+        if detected_skills is None:
+            detected_skills = document.skills
+        vector = model.tfidf.transform([document.clean]) if document.clean else None
+        return [
+            {"role": role, "score": score}
+            for role, score in model.role_classifier.rank(detected_skills, vector, top_n)
+        ]
+
     def predict(self, resume_text, top_k=3):
         """
         Predicts top_k job roles for the given resume text.
         Returns a list of dictionaries with result details.
         """
+        return self.predict_batch([resume_text], top_k=top_k)[0]
+
+    def predict_batch(self, resume_texts, top_k=3):
+        """
+        Predicts top_k job roles for many resumes at once: one tfidf.transform
+        call and one sparse similarity matrix against job_vectors.
+        Returns one result list (as from predict) per input text.
+        """
         # Ensure models are loaded
-        if self.tfidf is None or self.job_vectors is None:
+        if self.artifacts is None:
             success = self._load_models()
             if not success:
-               return [{"role": "Error", "score": 0.0, "description": "Models not found. Please run train_model.py first."}]
+               return [[{"role": "Error", "score": 0.0, "description": "Models not found. Please run train_model.py first."}] for _ in resume_texts]
+        # One consistent model for the whole call, even if a reload swaps it
+        model = self.artifacts
         
-        # 1. Clean Text
-        clean_resume = clean_text(resume_text)
+        # 1. Clean Text (documents carry their cleaned text)
+        clean_resumes = [as_document(text).clean for text in resume_texts]
+        batch = [i for i, clean_resume in enumerate(clean_resumes) if clean_resume]
         
-        if not clean_resume:
-             return [{"role": "Error", "score": 0.0, "description": "Resume text could not be extracted or is empty."}]
+        results = [
+            [{"role": "Error", "score": 0.0, "description": "Resume text could not be extracted or is empty."}]
+            for _ in resume_texts
+        ]
+        if not batch:
+            return results
 
         # 2. Vectorize
-        resume_vector = self.tfidf.transform([clean_resume])
-        
-        # 3. Calculate Similarity
-        similarities = cosine_similarity(resume_vector, self.job_vectors).flatten()
+        resume_vectors = model.tfidf.transform([clean_resumes[i] for i in batch])
+        k = min(top_k, len(model.job_roles), model.job_vectors.shape[0])
+
+        if model.index is not None:
+            # Large corpus: sub-linear search over roles sharing terms with the
+            # resume, padded with zero-score roles like the exact path
+            for i, (indices, scores) in zip(batch, model.index.search(resume_vectors, k)):
+                matches = list(zip(indices.tolist(), scores.tolist()))
+                found = set(indices.tolist())
+                matches += [(idx, 0.0) for idx in range(k + len(found)) if idx not in found][:k - len(matches)]
+                results[i] = [
+                    {
+                        "role": model.job_roles[idx]['role'],
+                        "score": float(score),
+                        "description": model.job_roles[idx]['description']
+                    }
+                    for idx, score in matches
+                ]
+            return results
+
+        # 3. Calculate Similarity (rows: resumes, columns: job roles)
+        # (scikit-learn is imported on first use: it dominates cold start)
+        from sklearn.metrics.pairwise import cosine_similarity
+        from sklearn.preprocessing import normalize
+        if model.normalized:
+            # Job rows are already unit length: a sparse product is the cosine,
+            # and the shared job matrix is never copied
+            similarities = (normalize(resume_vectors) @ model.job_vectors.T).tocsr()
+        else:
+            similarities = cosine_similarity(resume_vectors, model.job_vectors, dense_output=False).tocsr()
         
         # 4. Get Top K
-        # Check if we have fewer roles than K
-        k = min(top_k, len(self.job_roles))
-        top_indices = similarities.argsort()[-k:][::-1]
-        
-        results = []
-        for idx in top_indices:
-            results.append({
-                "role": self.job_roles[idx]['role'],
-                "score": float(similarities[idx]),
-                "description": self.job_roles[idx]['description']
-            })
+        # (k is capped above when there are fewer roles than requested)
+        for row, i in enumerate(batch):
+            scores = similarities.getrow(row).toarray().ravel()
+            results[i] = [
+                {
+                    "role": model.job_roles[idx]['role'],
+                    "score": float(scores[idx]),
+                    "description": model.job_roles[idx]['description']
+                }
+                for idx in _top_k(scores, k)
+            ]
             
         return results
@@ -0,0 +1,252 @@
+import json
+import os
+
+import numpy as np
+
+from services.role_index import top_k
+from services.taxonomy import get_taxonomy
+
+# Stored next to the TF-IDF pickles and copied into every model bundle
+FILENAME = 'role_classifier.npz'
+FORMAT = 1
+
+# Synthetic skill profiles generated per role for training; roles with fewer
+# than FULL_PROFILE skills get proportionally fewer, so a role known by one
+# or two skills cannot claim every resume mentioning them
+SAMPLES_PER_ROLE = int(os.environ.get("ROLE_CLASSIFIER_SAMPLES", 300))
+FULL_PROFILE = 6
+# Inverse L2 regularization strength of each role's logistic model
+REGULARIZATION = 0.2
+# Share of samples mixing two roles (labelled with both), and of samples
+# with unrelated skills added as noise
+BLEND_RATE = 0.25
+NOISE_RATE = 0.5
+# A sample is also labelled with every role holding this share of its skills
+OVERLAP_LABEL = 0.6
+SEED = 0
+
+
+class RoleClassifier:
+    """
+    Multi-label role classifier: one logistic model per role over two
+    feature blocks, an indicator per taxonomy skill and the resume's TF-IDF
+    vector from the JobPredictor model it was trained with.
+
+    Only the weights are stored, so scoring a resume is a few numpy row
+    sums: no scikit-learn and no network at serving time.
+    """
+
+    def __init__(self, roles, skills, skill_weights, text_columns, text_weights, bias, model_version=None):
+        self.roles = list(roles)
+        self.skills = list(skills)
+        self.skill_rows = {skill: i for i, skill in enumerate(self.skills)}
+        self.skill_weights = skill_weights
+        # Sorted feature columns of the TF-IDF model seen in training; the
+        # weights of all other columns are zero
+        self.text_columns = text_columns
+        self.text_weights = text_weights
+        self.bias = bias
+        # Version of the TF-IDF model (model_registry.source_version) whose
+        # features text_weights belong to
+        self.model_version = model_version
+
+    def probabilities(self, detected_skills, text_vector=None):
+        """Probability of every role (in self.roles order) for the skills and 1-row TF-IDF vector."""
+        logits = self.bias.copy()
+        rows = skill_rows(self.skill_rows, detected_skills)
+        if rows:
+            # Unit-length skill block, like the TF-IDF block
+            logits += self.skill_weights[rows].sum(axis=0) / np.sqrt(len(rows))
+        if text_vector is not None and text_vector.nnz and len(self.text_columns):
+            pos = np.searchsorted(self.text_columns, text_vector.indices)
+            pos[pos >= len(self.text_columns)] = 0
+            known = self.text_columns[pos] == text_vector.indices
+            logits += text_vector.data[known] @ self.text_weights[pos[known]]
+        return 1 / (1 + np.exp(-logits))
+
+    def rank(self, detected_skills, text_vector=None, top_n=None):
+        """[(role, probability)] best first; every role when top_n is None."""
+        probabilities = self.probabilities(detected_skills, text_vector)
+        return [(self.roles[i], float(probabilities[i]))
+                for i in top_k(probabilities, len(self.roles) if top_n is None else top_n)]
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                roles=np.array(self.roles),
+                skills=np.array(self.skills),
+                skill_weights=self.skill_weights,
+                text_columns=self.text_columns,
+                text_weights=self.text_weights,
+                bias=self.bias,
+                meta=np.array(json.dumps({"format": FORMAT, "model_version": self.model_version})),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format") != FORMAT:
+                raise ValueError(f"Unsupported role classifier format {meta.get('format')!r}")
+            return cls(
+                data["roles"].tolist(), data["skills"].tolist(), data["skill_weights"],
+                data["text_columns"], data["text_weights"], data["bias"], meta.get("model_version")
+            )
+
+
+def skill_rows(rows, skills):
+    """
+    Feature rows of the distinct skills, without those only implied by a
+    longer one ("C" inside "C++" is not evidence of its own).
+    """
+    skills = get_taxonomy().matcher.collapse(list(dict.fromkeys(skills)))
+    return [rows[skill] for skill in skills if skill in rows]
+
+
+def load_for_model(model_dir, model_version):
+    """
+    The classifier stored in model_dir, or None when there is none or it
+    was trained on another TF-IDF model (retrain to use it again).
+    """
+    path = os.path.join(model_dir, FILENAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        classifier = RoleClassifier.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Role classifier {path} could not be loaded: {e}")
+        return None
+    if classifier.model_version != model_version:
+        print(f"Role classifier {path} belongs to model {classifier.model_version}, not {model_version}; ignoring it")
+        return None
+    return classifier
+
+
+def role_profiles(role_descriptions, taxonomy):
+    """
+    {role: (skills, description words)} for every role the classifier
+    learns: the (role, description) pairs given, with the taxonomy skills
+    found in the description, plus the taxonomy's role -> skill mappings.
+    """
+    profiles = {}
+    for role, description in role_descriptions:
+        description = description if isinstance(description, str) else ""
+        skills, words = profiles.get(role, (set(), []))
+        skills.update(taxonomy.matcher.match(description))
+        profiles[role] = (skills, words + description.split())
+    for role, skills in taxonomy.roles.items():
+        known, words = profiles.get(role, (set(), []))
+        profiles[role] = (known | set(skills), words or " ".join(skills).split())
+    return {
+        role: (sorted(taxonomy.matcher.collapse(list(skills))), words)
+        for role, (skills, words) in profiles.items() if skills
+    }
+
+
+def _sample(rng, items, low, high):
+    count = int(rng.integers(min(low, len(items)), min(high, len(items)) + 1))
+    return [items[i] for i in rng.choice(len(items), size=count, replace=False)]
+
+
+def make_samples(profiles, skills, samples_per_role=SAMPLES_PER_ROLE, seed=SEED):
+    """
+    Synthetic training resumes: random subsets of a role's skills (some
+    mixed with a second role, some with unrelated skills) plus words of its
+    description. Returns (skill lists, texts, label sets of role indices).
+    """
+    rng = np.random.default_rng(seed)
+    roles = list(profiles)
+    role_skills = [set(profiles[role][0]) for role in roles]
+    samples, texts, labels = [], [], []
+    for i, role in enumerate(roles):
+        share = min(1.0, len(profiles[role][0]) / FULL_PROFILE)
+        for _ in range(max(1, round(samples_per_role * share))):
+            sources = [i]
+            if rng.random() < BLEND_RATE:
+                sources.append(int(rng.integers(len(roles))))
+            chosen, words = [], []
+            for source in dict.fromkeys(sources):
+                source_skills, source_words = profiles[roles[source]]
+                chosen += _sample(rng, source_skills, 2, len(source_skills))
+                words += _sample(rng, source_words, 0, len(source_words))
+            chosen = list(dict.fromkeys(chosen))
+
+            # Every role holding most of the sampled skills fits the profile too
+            label = set(sources)
+            for j, known in enumerate(role_skills):
+                if sum(skill in known for skill in chosen) >= OVERLAP_LABEL * len(chosen):
+                    label.add(j)
+
+            if rng.random() < NOISE_RATE:
+                chosen += _sample(rng, skills, 1, 2)
+            samples.append(chosen)
+            texts.append(" ".join(chosen + words))
+            labels.append(label)
+    return samples, texts, labels
+
+
+def train(role_descriptions, vectorizer, model_version=None, taxonomy=None,
+          samples_per_role=SAMPLES_PER_ROLE, seed=SEED):
+    """
+    Trains a RoleClassifier on synthetic profiles of the given (role,
+    description) pairs and the taxonomy roles, using vectorizer (the
+    JobPredictor TF-IDF model) for the text features.
+    """
+    # Training only: serving never imports scikit-learn
+    from scipy.sparse import csr_matrix, hstack
+    from sklearn.linear_model import LogisticRegression
+    from services.cleaner import clean_texts
+
+    taxonomy = taxonomy or get_taxonomy()
+    skills = list(taxonomy.skills)
+    profiles = role_profiles(role_descriptions, taxonomy)
+    roles = list(profiles)
+    samples, texts, labels = make_samples(profiles, skills, samples_per_role, seed)
+
+    # 1. Features: skill indicators + TF-IDF restricted to the columns in use
+    columns_of = {skill: i for i, skill in enumerate(skills)}
+    rows, columns, values = [], [], []
+    for row, chosen in enumerate(samples):
+        known = skill_rows(columns_of, chosen)
+        rows += [row] * len(known)
+        columns += known
+        values += [1 / np.sqrt(len(known))] * len(known)
+    skill_matrix = csr_matrix((values, (rows, columns)), shape=(len(samples), len(skills)))
+    text_matrix = csr_matrix(vectorizer.transform(clean_texts(texts)))
+    text_columns = np.unique(text_matrix.indices).astype(np.int64)
+    features = hstack([skill_matrix, text_matrix[:, text_columns]], format='csr')
+
+    # 2. One-vs-rest logistic regression, one role at a time
+    weights = np.zeros((features.shape[1], len(roles)))
+    bias = np.zeros(len(roles))
+    for j in range(len(roles)):
+        target = np.array([j in label for label in labels])
+        model = LogisticRegression(C=REGULARIZATION, max_iter=1000).fit(features, target)
+        weights[:, j] = model.coef_[0]
+        bias[j] = model.intercept_[0]
+
+    return RoleClassifier(roles, skills, weights[:len(skills)], text_columns, weights[len(skills):], bias,
+                          model_version=model_version)
+
+
+if __name__ == "__main__":
+    import pickle
+    import warnings
+
+    from services import model_registry
+
+    # Pickled models from another scikit-learn version warn on load
+    warnings.filterwarnings("ignore")
+    with open(os.path.join(model_registry.MODEL_DIR, 'tfidf.pkl'), 'rb') as f:
+        tfidf = pickle.load(f)
+    with open(model_registry.DATA_PATH, 'r', encoding='utf-8') as f:
+        job_roles = json.load(f)
+
+    classifier = train([(role["role"], role["description"]) for role in job_roles], tfidf,
+                       model_version=model_registry.source_version())
+    classifier.save(os.path.join(model_registry.MODEL_DIR, FILENAME))
+    manifest = model_registry.publish_bundle()
+    print(f"✅ Trained role classifier ({len(classifier.roles)} roles); published model bundle {manifest['version']}")
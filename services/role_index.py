@@ -0,0 +1,175 @@
+import os
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# Below this many job rows a full sparse product is cheaper than the index
+MIN_ROWS = int(os.environ.get("ROLE_INDEX_MIN_ROWS", 50000))
+# Highest-weighted postings kept per term (impact-ordered pruning)
+MAX_POSTINGS = int(os.environ.get("ROLE_INDEX_MAX_POSTINGS", 1000))
+# Candidates re-scored exactly before taking the top k
+CANDIDATES = int(os.environ.get("ROLE_INDEX_CANDIDATES", 100))
+
+
+def top_k(scores, k):
+    """Indices of the k highest scores, best first, without a full sort."""
+    if k <= 0:
+        return np.array([], dtype=int)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+class RoleIndex:
+    """
+    Approximate top-k search over l2-normalized TF-IDF job rows.
+
+    Each term keeps only its max_postings highest-weighted jobs (impact
+    ordered pruning), so scoring touches a bounded number of postings per
+    query term no matter how large the corpus grows. The best candidates
+    from those partial dot products are re-scored exactly against the full
+    rows: returned scores are true cosines and only recall is approximate.
+
+    pruned takes postings already built by prune_postings (e.g. memory-mapped
+    from the model arrays) instead of building them in this process.
+    """
+
+    def __init__(self, job_vectors, max_postings=MAX_POSTINGS, candidates=CANDIDATES, pruned=None):
+        self.job_vectors = csr_matrix(job_vectors)
+        self.n_rows, self.n_terms = self.job_vectors.shape
+        self.candidates = candidates
+        self.pruned = pruned if pruned is not None else prune_postings(self.job_vectors, max_postings)
+
+    def search(self, query_vectors, k):
+        """
+        Returns one (indices, scores) pair per query row, best first.
+        Query rows are l2-normalized here.
+        """
+        from sklearn.preprocessing import normalize
+        queries = normalize(csr_matrix(query_vectors))
+        # 1. Partial scores for all queries at once over the pruned postings
+        partial = (queries @ self.pruned.T).tocsr()
+
+        results = []
+        for row in range(queries.shape[0]):
+            start, end = partial.indptr[row], partial.indptr[row + 1]
+            if start == end or k <= 0:
+                results.append((np.array([], dtype=int), np.array([], dtype=np.float64)))
+                continue
+            # 2. Re-score the most promising candidates exactly
+            scores = partial.data[start:end]
+            shortlist = partial.indices[start:end][top_k(scores, min(max(self.candidates, k), end - start))]
+            exact = (self.job_vectors[shortlist] @ queries[row].T).toarray().ravel()
+            best = top_k(exact, min(k, len(shortlist)))
+            results.append((shortlist[best], exact[best]))
+        return results
+
+
+def prune_postings(job_vectors, max_postings=MAX_POSTINGS):
+    """
+    The job matrix keeping only the max_postings highest weights of every
+    term (column), as a CSR matrix of the same shape.
+    """
+    # Rank every posting within its term by weight and drop the tail
+    by_term = csr_matrix(job_vectors).tocsc()
+    terms = np.repeat(np.arange(by_term.shape[1]), np.diff(by_term.indptr))
+    order = np.argsort(-by_term.data, kind='stable')
+    order = order[np.argsort(terms[order], kind='stable')]
+    rank = np.arange(len(order)) - by_term.indptr[terms[order]]
+    keep = order[rank < max_postings]
+    return csr_matrix((by_term.data[keep], (by_term.indices[keep], terms[keep])), shape=by_term.shape)
+
+
+def exact_search(job_vectors, query_vectors, k):
+    """Brute-force reference for RoleIndex.search (same return format)."""
+    from sklearn.preprocessing import normalize
+    scores = (normalize(csr_matrix(query_vectors)) @ csr_matrix(job_vectors).T).toarray()
+    results = []
+    for row in scores:
+        best = top_k(row, min(k, int(np.count_nonzero(row))))
+        results.append((best, row[best]))
+    return results
+
+
+def recall_benchmark(job_vectors, query_vectors, k=10, **index_options):
+    """
+    Compares RoleIndex against exact search on the same queries.
+    Returns recall@k plus build and per-query latencies (ms).
+    """
+    started = time.perf_counter()
+    index = RoleIndex(job_vectors, **index_options)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    approximate = index.search(query_vectors, k)
+    index_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    reference = exact_search(job_vectors, query_vectors, k)
+    exact_ms = (time.perf_counter() - started) * 1000
+
+    found = expected = 0
+    for (approx_ids, _), (exact_ids, _) in zip(approximate, reference):
+        found += len(set(approx_ids.tolist()) & set(exact_ids.tolist()))
+        expected += len(exact_ids)
+
+    n_queries = query_vectors.shape[0]
+    return {
+        "rows": job_vectors.shape[0],
+        "queries": n_queries,
+        "k": k,
+        "recall": found / expected if expected else 1.0,
+        "build_ms": round(build_ms, 1),
+        "index_ms_per_query": round(index_ms / n_queries, 3),
+        "exact_ms_per_query": round(exact_ms / n_queries, 3),
+    }
+
+
+def synthetic_corpus(rows, terms=50000, terms_per_row=120, queries=50, topics=500, seed=0):
+    """
+    Random job-posting-like TF-IDF rows plus resume-like queries. Each row
+    mixes words from one of `topics` roles (their own skewed vocabulary)
+    with Zipf-distributed general words; rows are idf-weighted and
+    l2-normalized like the trained job_vectors.
+    """
+    rng = np.random.default_rng(seed)
+    general_probs = 1.0 / np.arange(1, terms + 1)
+    general_probs /= general_probs.sum()
+    topic_vocab = rng.choice(terms, size=(topics, 200))
+    n_topic_terms = int(terms_per_row * 0.6)
+
+    def counts(n_rows):
+        row_topics = rng.integers(0, topics, n_rows)
+        general = rng.choice(terms, size=(n_rows, terms_per_row - n_topic_terms), p=general_probs)
+        ranks = rng.zipf(1.3, size=(n_rows, n_topic_terms)).clip(max=topic_vocab.shape[1]) - 1
+        columns = np.hstack([general, topic_vocab[row_topics[:, None], ranks]])
+        data = rng.integers(1, 4, size=columns.shape).astype(np.float64)
+        indptr = np.arange(0, n_rows * terms_per_row + 1, terms_per_row)
+        matrix = csr_matrix((data.ravel(), columns.ravel(), indptr), shape=(n_rows, terms))
+        matrix.sum_duplicates()
+        return matrix
+
+    job_counts = counts(rows)
+    df = np.bincount(job_counts.indices, minlength=terms)
+    idf = np.log((1 + rows) / (1 + df)) + 1
+    from sklearn.preprocessing import normalize
+    job_vectors = normalize(csr_matrix(job_counts.multiply(idf)))
+    return job_vectors, normalize(csr_matrix(counts(queries).multiply(idf)))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Recall and latency of the role index against exact search.")
+    arg_parser.add_argument("--rows", type=int, nargs='+', default=[10000, 100000, 300000])
+    arg_parser.add_argument("-k", type=int, default=10)
+    arg_parser.add_argument("--max-postings", type=int, default=MAX_POSTINGS)
+    arg_parser.add_argument("--candidates", type=int, default=CANDIDATES)
+    args = arg_parser.parse_args()
+
+    for rows in args.rows:
+        jobs, queries = synthetic_corpus(rows)
+        print(recall_benchmark(jobs, queries, k=args.k, max_postings=args.max_postings, candidates=args.candidates))
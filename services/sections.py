@@ -0,0 +1,128 @@
+import re
+
+# Section name -> heading patterns (regex, matched against a whole
+# lower-cased line, optionally followed by a colon)
+DEFAULT_SECTIONS = {
+    "experience": [r'experience', r'work experience', r'professional experience', r'work history',
+                   r'employment', r'employment history', r'professional background'],
+    "projects": [r'projects', r'personal projects', r'academic projects', r'technical projects'],
+    "summary": [r'summary', r'professional summary', r'objective', r'about me', r'profile'],
+    "education": [r'education', r'academic background', r'qualifications'],
+    "skills": [r'skills', r'technical skills', r'core competencies', r'technologies'],
+    "certifications": [r'certifications', r'certificates', r'licenses', r'licenses (?:and|&) certifications'],
+}
+
+BULLETS = ('•', '*', '-')
+
+# Lines shorter than this (and not bulleted) start a new entry
+TITLE_MAX_CHARS = 60
+
+
+class SectionSegmenter:
+    """
+    Splits resume text into section entries in a single pass.
+
+    All section headings are compiled into one anchored regex up front, so
+    each line costs one match. Every entry is a span dict:
+    {"section", "title", "details", "start", "end"} where title is the
+    short heading line of a role/project (None if the section opens with a
+    detail), details are its following lines (bullet markers removed) and
+    start/end are character offsets in the original text.
+    """
+
+    def __init__(self, sections=None, max_lines=100):
+        self.sections = dict(DEFAULT_SECTIONS if sections is None else sections)
+        self.max_lines = max_lines
+        self._compile()
+
+    def add_section(self, name, patterns):
+        """Registers (or extends) a section and recompiles the matcher."""
+        self.sections[name] = list(self.sections.get(name, [])) + list(patterns)
+        self._compile()
+
+    def _compile(self):
+        # One named group per section; the first section listed wins ties
+        self._names = list(self.sections)
+        groups = "|".join(
+            f"(?P<s{i}>{'|'.join(f'(?:{p})' for p in self.sections[name])})"
+            for i, name in enumerate(self._names)
+        )
+        self._heading = re.compile(rf'(?:{groups})\s*(?::|$)')
+
+    def heading(self, line):
+        """Section name if the (stripped) line is a section heading, else None."""
+        match = self._heading.match(line.lower())
+        if match is None:
+            return None
+        return self._names[int(match.lastgroup[1:])]
+
+    def segment(self, text):
+        """Returns every entry span in document order."""
+        spans = []
+        if not text:
+            return spans
+
+        section = None
+        used = {}
+        current = None
+        pos = 0
+        for line in text.split('\n'):
+            line_start = pos
+            pos += len(line) + 1
+            clean_line = line.strip()
+            if len(clean_line) < 3:
+                continue
+
+            # 1. Section headings switch the current section
+            name = self.heading(clean_line)
+            if name is not None:
+                section, current = name, None
+                continue
+            if section is None or used.get(section, 0) >= self.max_lines:
+                continue
+            used[section] = used.get(section, 0) + 1
+
+            start = line_start + line.index(clean_line[0])
+            end = start + len(clean_line)
+
+            # 2. Short, non-bulleted lines are titles; everything else is a detail
+            if not clean_line.startswith(BULLETS) and len(clean_line) < TITLE_MAX_CHARS:
+                current = {"section": section, "title": clean_line, "details": [], "start": start, "end": end}
+                spans.append(current)
+                continue
+            if current is None:
+                current = {"section": section, "title": None, "details": [], "start": start, "end": end}
+                spans.append(current)
+            current["details"].append(clean_line.lstrip(''.join(BULLETS)).strip())
+            current["end"] = end
+        return spans
+
+    def segment_by_section(self, text, limit=10):
+        """{section: [spans]} with at most `limit` entries per section."""
+        return self.group(self.segment(text), limit)
+
+    def group(self, spans, limit=10):
+        """Groups spans from segment() by section, keeping `limit` per section."""
+        grouped = {name: [] for name in self.sections}
+        for span in spans:
+            entries = grouped.setdefault(span["section"], [])
+            if len(entries) < limit:
+                entries.append(span)
+        return grouped
+
+
+def format_span(span):
+    """One-line summary of an entry: "title | detail | detail"."""
+    parts = [span["title"]] if span["title"] else []
+    return " | ".join(parts + span["details"])
+
+
+_segmenter = None
+
+
+def get_segmenter():
+    """Process-wide segmenter (sections added to it apply everywhere)."""
+    global _segmenter
+    if _segmenter is None:
+        _segmenter = SectionSegmenter()
+    return _segmenter
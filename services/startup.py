@@ -0,0 +1,90 @@
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds per startup phase of this process ("import", "warmup", ...)
+PHASES = {}
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def record(phase, seconds):
+    PHASES[phase] = seconds
+
+
+@contextmanager
+def timed_phase(phase):
+    """Records the duration of the with-block as a startup phase."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started)
+
+
+def summary():
+    """One-line description of the recorded phases, e.g. for the server log."""
+    return ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in PHASES.items())
+
+
+def import_breakdown(module="main", python=sys.executable, cwd=BASE_DIR):
+    """
+    Imports module in a fresh interpreter under `-X importtime` and returns
+    {"module", "total_ms", "packages": {package: ms}, "modules": {module: ms}}
+    with the self time of every imported module and its sum per top-level
+    package, both sorted slowest first.
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = int(self_us) / 1000
+        if not indent:
+            total += int(cumulative_us) / 1000
+
+    packages = {}
+    for name, ms in modules.items():
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0.0) + ms
+
+    def slowest(times):
+        return {name: round(ms, 2) for name, ms in sorted(times.items(), key=lambda item: -item[1])}
+
+    return {"module": module, "total_ms": round(total, 2), "packages": slowest(packages), "modules": slowest(modules)}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    arg_parser = argparse.ArgumentParser(description="Import-time breakdown of an entry point (cold start).")
+    arg_parser.add_argument("module", nargs='?', default="main")
+    arg_parser.add_argument("-n", "--top", type=int, default=15, help="Packages / modules to list")
+    arg_parser.add_argument("--json", action="store_true", help="Print the full breakdown as JSON")
+    args = arg_parser.parse_args()
+
+    report = import_breakdown(args.module)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        sys.exit(0)
+
+    print(f"import {report['module']}: {report['total_ms']:.1f} ms")
+    for title, times in (("package", report["packages"]), ("module", report["modules"])):
+        print(f"\n{title:<48}{'self ms':>10}")
+        for name, ms in list(times.items())[:args.top]:
+            print(f"{name:<48}{ms:>10.1f}")
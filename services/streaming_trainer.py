@@ -0,0 +1,270 @@
+import json
+import os
+import pickle
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.sparse import csr_matrix, load_npz, save_npz, vstack
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from services.cleaner import clean_texts
+from services import role_classifier
+from services.model_registry import DATA_PATH, publish_bundle, source_version
+
+# Columns tried, in order, for the role title and the text to vectorize
+TITLE_COLUMNS = ['title', 'role', 'job_title', 'name']
+TEXT_COLUMNS = ['description', 'skills', 'job_description', 'desc']
+
+N_FEATURES = int(os.environ.get("TRAIN_HASH_FEATURES", 2 ** 20))
+CHUNK_SIZE = int(os.environ.get("TRAIN_CHUNK_SIZE", 5000))
+
+# Kept per posting in the role data returned with predictions
+DESCRIPTION_CHARS = 300
+
+# Running totals per role title (summed term counts and role data) and
+# corpus document frequencies: appending new postings only processes those
+# postings, then re-weights the stored totals
+COUNTS_FILE = 'role_counts.npz'
+DF_FILE = 'doc_freqs.npz'
+ROLES_FILE = 'role_totals.json'
+# Served role data: one entry (and one job vector) per distinct role title
+PROFILES_FILE = 'role_profiles.json'
+
+
+class HashingTfidf:
+    """
+    TF-IDF over hashed terms (same cleaning, stop words and l2 norm as the
+    TfidfVectorizer model). There is no vocabulary to fit, so any worker can
+    vectorize any chunk, and postings can be added without a full refit:
+    only the idf weights are recomputed from the stored counts.
+    """
+
+    def __init__(self, n_features=N_FEATURES):
+        self.n_features = n_features
+        self.hasher = HashingVectorizer(
+            n_features=n_features, stop_words='english', alternate_sign=False, norm=None
+        )
+        self.idf_ = np.ones(n_features)
+
+    def counts(self, texts):
+        return self.hasher.transform(texts)
+
+    def fit_idf(self, df, n_documents):
+        """Smoothed idf from document frequencies, as TfidfVectorizer computes it."""
+        self.idf_ = np.log((1 + n_documents) / (1 + df)) + 1
+        return self
+
+    def weight(self, counts):
+        return normalize(csr_matrix(counts.multiply(self.idf_)))
+
+    def transform(self, texts):
+        return self.weight(self.counts(texts))
+
+
+def iter_records(path, chunk_size=CHUNK_SIZE):
+    """
+    Yields lists of posting dicts from a JSON Lines file without loading it
+    whole. A plain JSON array (like data/job_roles.json) is read at once.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        if first == '[':
+            f.seek(0)
+            records = json.load(f)
+            for start in range(0, len(records), chunk_size):
+                yield records[start:start + chunk_size]
+            return
+
+        f.seek(0)
+        chunk = []
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            chunk.append(json.loads(line))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _pick(record, columns):
+    return next((record[c] for c in columns if record.get(c)), None)
+
+
+def process_chunk(records, n_features=N_FEATURES):
+    """
+    Cleans and hashes one chunk (runs in a worker process).
+    Returns (term counts, role entries) for the usable records.
+    """
+    vectorizer = HashingTfidf(n_features)
+    texts, roles = [], []
+    for record in records:
+        title, text = _pick(record, TITLE_COLUMNS), _pick(record, TEXT_COLUMNS)
+        if not title or not text:
+            continue
+        if isinstance(text, list):
+            text = " ".join(map(str, text))
+        texts.append(str(text))
+        roles.append({"role": str(title), "description": str(text)[:DESCRIPTION_CHARS]})
+    return vectorizer.counts(clean_texts(texts)), roles
+
+
+class RoleTotals:
+    """
+    Running totals of the postings seen so far, per role title (compared
+    case- and whitespace-insensitively): summed term counts, posting count
+    and spellings, plus the corpus document frequencies. Memory grows with
+    the number of distinct roles, not with the number of postings.
+    """
+
+    def __init__(self, n_features=N_FEATURES):
+        self.n_features = n_features
+        self.counts = csr_matrix((0, n_features))
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.postings = 0
+        self.entries = []
+        self.keys = {}
+
+    def add(self, counts, roles):
+        """Adds one chunk: a count row and a role entry per posting."""
+        groups = np.empty(len(roles), dtype=np.int64)
+        for i, role in enumerate(roles):
+            key = " ".join(role["role"].split()).lower()
+            group = self.keys.get(key)
+            if group is None:
+                group = self.keys[key] = len(self.entries)
+                self.entries.append({"role": role["role"], "description": role["description"],
+                                     "postings": 0, "spellings": {}})
+            entry = self.entries[group]
+            entry["postings"] += 1
+            entry["spellings"][role["role"]] = entry["spellings"].get(role["role"], 0) + 1
+            groups[i] = group
+
+        counts = csr_matrix(counts)
+        counts.sum_duplicates()
+        self.df += np.bincount(counts.indices, minlength=self.n_features)
+        self.postings += len(roles)
+        membership = csr_matrix(
+            (np.ones(len(roles)), (groups, np.arange(len(roles)))), shape=(len(self.entries), len(roles))
+        )
+        new_rows = len(self.entries) - self.counts.shape[0]
+        if new_rows:
+            self.counts = vstack([self.counts, csr_matrix((new_rows, self.n_features))], format='csr')
+        self.counts = (self.counts + membership @ counts).tocsr()
+
+    def profiles(self):
+        """Served role data: one entry per role, named by its most common spelling."""
+        return [
+            {"role": max(entry["spellings"], key=entry["spellings"].get),
+             "description": entry["description"], "postings": entry["postings"]}
+            for entry in self.entries
+        ]
+
+    def vectors(self, vectorizer):
+        """One unit-length TF-IDF row per role, from its summed counts."""
+        return vectorizer.fit_idf(self.df, self.postings).weight(self.counts)
+
+    def save(self, model_dir):
+        save_npz(os.path.join(model_dir, COUNTS_FILE), self.counts)
+        with open(os.path.join(model_dir, DF_FILE), 'wb') as f:
+            np.savez(f, df=self.df, postings=self.postings)
+        with open(os.path.join(model_dir, ROLES_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+
+    @classmethod
+    def load(cls, model_dir, n_features=N_FEATURES):
+        totals = cls(n_features)
+        counts = load_npz(os.path.join(model_dir, COUNTS_FILE)).tocsr()
+        if counts.shape[1] != n_features:
+            raise ValueError(f"Stored counts use {counts.shape[1]} hash features, not {n_features}")
+        totals.counts = counts
+        with np.load(os.path.join(model_dir, DF_FILE)) as data:
+            totals.df = data["df"]
+            totals.postings = int(data["postings"])
+        with open(os.path.join(model_dir, ROLES_FILE), 'r', encoding='utf-8') as f:
+            totals.entries = json.load(f)
+        totals.keys = {" ".join(entry["role"].split()).lower(): i for i, entry in enumerate(totals.entries)}
+        return totals
+
+
+def train_streaming(source, model_dir, append=False, workers=None, chunk_size=CHUNK_SIZE,
+                    n_features=N_FEATURES, publish=True):
+    """
+    Trains (or with append=True, extends) a hashing TF-IDF model from a
+    JSON Lines file. Chunks are cleaned and hashed in parallel; the main
+    process only adds their counts to the per-role totals.
+    Writes JobPredictor-compatible artifacts and publishes a model bundle.
+    Returns a summary dict.
+    """
+    started = time.time()
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(model_dir, exist_ok=True)
+    profiles_path = os.path.join(model_dir, PROFILES_FILE)
+    totals = RoleTotals.load(model_dir, n_features) if append else RoleTotals(n_features)
+
+    # 1. Clean + hash chunks across processes, folding each into the role totals
+    added = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = iter_records(source, chunk_size)
+        for counts, chunk_roles in _bounded_map(pool, chunks, 2 * workers, n_features):
+            totals.add(counts, chunk_roles)
+            added += len(chunk_roles)
+
+    if not totals.postings:
+        raise ValueError(f"No usable postings in {source}")
+
+    # 2. Weight every role's summed counts with idf over the whole corpus
+    vectorizer = HashingTfidf(n_features)
+    job_vectors = totals.vectors(vectorizer)
+    profiles = totals.profiles()
+
+    # 3. Save artifacts (and the role totals needed to append later)
+    totals.save(model_dir)
+    with open(profiles_path, 'w', encoding='utf-8') as f:
+        json.dump(profiles, f)
+    with open(os.path.join(model_dir, 'tfidf.pkl'), 'wb') as f:
+        pickle.dump(vectorizer, f)
+    with open(os.path.join(model_dir, 'job_vectors.pkl'), 'wb') as f:
+        pickle.dump(job_vectors, f)
+    with open(os.path.join(model_dir, 'job_roles.pkl'), 'wb') as f:
+        pickle.dump([profile["role"] for profile in profiles], f)
+
+    # 4. Role classifier on this model's features, learned from the curated
+    # role catalogue (data/job_roles.json) rather than every posting
+    with open(DATA_PATH, 'r', encoding='utf-8') as f:
+        catalogue = json.load(f)
+    classifier = role_classifier.train(
+        [(role["role"], role["description"]) for role in catalogue], vectorizer,
+        model_version=source_version(model_dir)
+    )
+    classifier.save(os.path.join(model_dir, role_classifier.FILENAME))
+
+    summary = {
+        "postings": totals.postings,
+        "added": added,
+        "roles": len(profiles),
+        "nnz": int(job_vectors.nnz),
+        "seconds": round(time.time() - started, 2),
+    }
+    if publish:
+        summary["version"] = publish_bundle(model_dir, profiles_path)["version"]
+    return summary
+
+
+def _bounded_map(pool, chunks, limit, n_features):
+    # Executor.map would read the whole file up front; keep at most `limit`
+    # chunks in flight so memory stays flat
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(process_chunk, chunk, n_features))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,317 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import string
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TAXONOMY_PATH = os.path.join(BASE_DIR, 'data', 'skill_taxonomy.json')
+DEFAULT_INDEX_PATH = os.path.join(BASE_DIR, 'model', 'skill_index.pkl')
+
+# Bump when the persisted index layout changes so stale files are rebuilt
+INDEX_FORMAT = 1
+
+# Separators are blanked out (hyphens too, for hyphen-agnostic matching) while
+# characters like +, #, . that are part of skills are kept.
+_SEPARATORS = re.compile(r'[,;/\\()|\[\]{}\-]')
+_WORD_CHARS = frozenset(string.ascii_lowercase + string.digits)
+
+
+def normalize(text):
+    """Lowercases text and blanks separators without changing its length."""
+    return _SEPARATORS.sub(' ', text.lower())
+
+
+def _trie_regex(forms):
+    """
+    Compiles a set of strings into a prefix-factored regex (a trie), so the
+    engine walks shared prefixes once instead of trying every alternative.
+    Longer continuations are tried first.
+    """
+    trie = {}
+    for form in forms:
+        node = trie
+        for char in form:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+def _implied_prefixes(forms):
+    """
+    For every form, lists the shorter forms that are boundary-prefixes of it
+    ("react" for "react native", "c" for "c++"). Walks a trie once per form,
+    so the cost is linear in the total taxonomy size.
+    """
+    trie = {}
+    for form in forms:
+        node = trie
+        for char in form:
+            node = node.setdefault(char, {})
+        node[''] = form
+
+    implied = {}
+    for form in forms:
+        node = trie
+        found = []
+        for i, char in enumerate(form[:-1]):
+            node = node[char]
+            if '' in node and form[i + 1] not in _WORD_CHARS:
+                found.append(node[''])
+        if found:
+            implied[form] = tuple(reversed(found))
+    return implied
+
+
+class SkillMatcher:
+    """
+    Finds every skill of a taxonomy in a single scan of the text.
+
+    All surface forms (canonical names and aliases) are compiled into one
+    trie-shaped regex anchored on alphanumeric boundaries. Each scan position
+    therefore yields the longest form starting there; shorter forms that are
+    boundary-prefixes of it (e.g. "React" inside "React Native", "C" inside
+    "C++") are precomputed so they are reported for the same position without
+    another pass. Matches are reported under the canonical skill name.
+    """
+
+    def __init__(self, skills, aliases=None):
+        self.skills = [sys.intern(skill) for skill in skills]
+        ids = {skill: i for i, skill in enumerate(self.skills)}
+
+        # normalized surface form -> canonical skill ids
+        forms = {}
+        surfaces = [(skill, skill) for skill in self.skills]
+        surfaces += [(alias, canonical) for alias, canonical in (aliases or {}).items()]
+        for surface, canonical in surfaces:
+            form = normalize(surface).strip()
+            if not form or canonical not in ids:
+                continue
+            skill_ids = forms.setdefault(form, [])
+            if ids[canonical] not in skill_ids:
+                skill_ids.append(ids[canonical])
+
+        self._forms = {form: tuple(skill_ids) for form, skill_ids in forms.items()}
+        self._implied = _implied_prefixes(self._forms)
+        self._source = _trie_regex(self._forms)
+        self._compile()
+
+    def _compile(self):
+        self._pattern = re.compile(rf'(?<![a-z0-9])(?=({self._source})(?![a-z0-9]))')
+
+    def to_state(self):
+        """Returns the built index as plain data for persistence."""
+        return {
+            "skills": self.skills,
+            "forms": self._forms,
+            "implied": self._implied,
+            "source": self._source,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Restores a matcher from to_state() output without rebuilding it."""
+        matcher = cls.__new__(cls)
+        matcher.skills = [sys.intern(skill) for skill in state["skills"]]
+        matcher._forms = state["forms"]
+        matcher._implied = state["implied"]
+        matcher._source = state["source"]
+        matcher._compile()
+        return matcher
+
+    def canonical(self, name):
+        """Returns the canonical skill for a name or alias, or None."""
+        skill_ids = self._forms.get(normalize(name).strip())
+        return self.skills[skill_ids[0]] if skill_ids else None
+
+    def collapse(self, skills):
+        """
+        Drops the skills that are only boundary-prefixes of a longer skill in
+        the list ("C" next to "C++", "React" next to "React Native").
+        """
+        implied_by = getattr(self, "_implied_by", None)
+        if implied_by is None:
+            implied_by = {}
+            for form, shorter in self._implied.items():
+                for short in shorter:
+                    for short_id in self._forms[short]:
+                        # Aliases ("react.js") imply their own skill: not a longer one
+                        longer = {self.skills[long_id] for long_id in self._forms[form] if long_id != short_id}
+                        if longer:
+                            implied_by.setdefault(self.skills[short_id], set()).update(longer)
+            self._implied_by = implied_by
+        present = set(skills)
+        return [skill for skill in skills if not implied_by.get(skill, set()) & present]
+
+    def finditer(self, text):
+        """Yields (skill, start, end) for every skill occurrence in text."""
+        if not text or not self._forms:
+            return
+        for match in self._pattern.finditer(normalize(text)):
+            form = match.group(1)
+            start = match.start(1)
+            seen = set()
+            for hit in (form,) + self._implied.get(form, ()):
+                for skill_id in self._forms[hit]:
+                    if skill_id not in seen:
+                        seen.add(skill_id)
+                        yield self.skills[skill_id], start, start + len(hit)
+
+    def match(self, text):
+        """
+        Returns a dict mapping each detected skill to the list of
+        (start, end) offsets where it occurs, in order of first appearance.
+        """
+        positions = {}
+        for skill, start, end in self.finditer(text):
+            positions.setdefault(skill, []).append((start, end))
+        return positions
+
+    def count(self, text):
+        """Returns a dict mapping each detected skill to its occurrence count."""
+        return {skill: len(spans) for skill, spans in self.match(text).items()}
+
+
+class SkillTaxonomy:
+    """
+    Skills, aliases and role -> skill mappings backed by one SkillMatcher.
+    """
+
+    def __init__(self, matcher, categories=None, roles=None, default_role_skills=None, version=None):
+        self.matcher = matcher
+        # SHA-1 of the data file this taxonomy was built from (set by load_taxonomy)
+        self.digest = None
+        self.categories = categories or {}
+        self.roles = roles or {}
+        self.default_role_skills = default_role_skills or []
+        self.version = version
+
+    @property
+    def skills(self):
+        return self.matcher.skills
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds the taxonomy (and its matcher) from the parsed data file."""
+        skills = []
+        aliases = {}
+        categories = {}
+        for entry in data.get("skills", []):
+            name = entry["name"]
+            skills.append(name)
+            if entry.get("category"):
+                categories[name] = sys.intern(entry["category"])
+            for alias in entry.get("aliases", []):
+                aliases[alias] = name
+
+        matcher = SkillMatcher(skills, aliases)
+
+        # Role skills are stored under their canonical names
+        def resolve(names):
+            return [matcher.canonical(name) or name for name in names]
+
+        roles = {role: resolve(names) for role, names in data.get("roles", {}).items()}
+        return cls(
+            matcher,
+            categories=categories,
+            roles=roles,
+            default_role_skills=resolve(data.get("default_role_skills", [])),
+            version=data.get("version"),
+        )
+
+    def to_state(self):
+        return {
+            "matcher": self.matcher.to_state(),
+            "categories": self.categories,
+            "roles": self.roles,
+            "default_role_skills": self.default_role_skills,
+            "version": self.version,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(
+            SkillMatcher.from_state(state["matcher"]),
+            categories=state["categories"],
+            roles=state["roles"],
+            default_role_skills=state["default_role_skills"],
+            version=state["version"],
+        )
+
+    def canonical(self, name):
+        return self.matcher.canonical(name)
+
+    def role_skills(self, role):
+        """Returns the target skills for a role, or the default set."""
+        return self.roles.get(role, self.default_role_skills)
+
+
+def load_taxonomy(path=None, index_path=None):
+    """
+    Loads the skill taxonomy, reusing the prebuilt binary index when it was
+    built from the same data file. Otherwise the index is rebuilt from the
+    JSON and persisted for the next boot.
+    """
+    path = path or os.environ.get("SKILL_TAXONOMY_PATH", DEFAULT_TAXONOMY_PATH)
+    index_path = index_path or os.environ.get("SKILL_INDEX_PATH", DEFAULT_INDEX_PATH)
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).hexdigest()
+
+    try:
+        with open(index_path, 'rb') as f:
+            state = pickle.load(f)
+        if state.get("format") == INDEX_FORMAT and state.get("digest") == digest:
+            taxonomy = SkillTaxonomy.from_state(state["taxonomy"])
+            taxonomy.digest = digest
+            return taxonomy
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError):
+        pass
+
+    taxonomy = SkillTaxonomy.from_dict(json.loads(raw.decode('utf-8')))
+    taxonomy.digest = digest
+    save_index(taxonomy, digest, index_path)
+    return taxonomy
+
+
+def save_index(taxonomy, digest, index_path=DEFAULT_INDEX_PATH):
+    """Atomically writes the binary index next to the other model artifacts."""
+    state = {"format": INDEX_FORMAT, "digest": digest, "taxonomy": taxonomy.to_state()}
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        print(f"Skill index could not be saved: {e}")
+
+
+_taxonomy = None
+
+
+def get_taxonomy():
+    """Returns the process-wide taxonomy, loading it on first use."""
+    global _taxonomy
+    if _taxonomy is None:
+        _taxonomy = load_taxonomy()
+    return _taxonomy
+
+
+if __name__ == "__main__":
+    taxonomy = load_taxonomy()
+    print(f"Skill index ready: {len(taxonomy.skills)} skills, {len(taxonomy.roles)} roles")
@@ -79,8 +79,10 @@ document.addEventListener('DOMContentLoaded', () => {
             loadingState.classList.remove('hidden');
             const formData = new FormData();
             formData.append('file', selectedFile);
+            let shown = false;
             try {
-                const response = await fetch('/analyze', {
+                // One JSON event per line, sent as each analysis stage finishes
+                const response = await fetch('/analyze/stream', {
                     method: 'POST',
                     body: formData
                 });
@@ -88,30 +90,88 @@ document.addEventListener('DOMContentLoaded', () => {
                     const errorData = await response.json();
                     throw new Error(errorData.detail || 'Analysis failed');
                 }
-                const data = await response.json();
-                displayResults(data);
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    const lines = buffer.split('\n');
+                    buffer = lines.pop();
+                    for (const line of lines) {
+                        if (!line.trim()) continue;
+                        const { event, data } = JSON.parse(line);
+                        if (event === 'error') throw new Error(data.error || 'Analysis failed');
+                        if (!shown) {
+                            // Show results as soon as the first stage is in
+                            shown = true;
+                            resetResults();
+                            loadingState.classList.add('hidden');
+                        }
+                        handleEvent(event, data);
+                    }
+                }
             } catch (error) {
                 alert('Error: ' + error.message);
-                filePreview.classList.remove('hidden');
+                if (!shown) filePreview.classList.remove('hidden');
             } finally {
                 loadingState.classList.add('hidden');
             }
         });
     }
 
-    function displayResults(data) {
-        resultsGrid.innerHTML = '';
+    function resetResults() {
+        resultsGrid.innerHTML = '<p class="stream-pending">Discovering matching roles...</p>';
         analysisTableBody.innerHTML = '';
-        document.getElementById('suggestions-list').innerHTML = '';
+        document.getElementById('suggestions-list').innerHTML = '<p class="stream-pending">Looking for openings...</p>';
         document.getElementById('skills-list').innerHTML = '';
         document.getElementById('projects-list').innerHTML = '';
         document.getElementById('experience-list').innerHTML = '';
+        document.getElementById('skill-roadmap').innerHTML = '';
+        document.getElementById('ats-score-value').textContent = '...';
+        document.getElementById('ats-meter-fill').style.width = '0%';
+
+        resultsSection.classList.remove('hidden');
+        sideNav.classList.remove('hidden');
+        resultsSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
+        initScrollSpy();
+    }
+
+    function handleEvent(event, data) {
+        switch (event) {
+            case 'text':
+                extractedTextPre.textContent = data.extracted_text || "No text extracted.";
+                break;
+            case 'skills':
+                renderSkills(data.detected_skills);
+                break;
+            case 'ats':
+                renderAtsScore(data.ats_score);
+                break;
+            case 'context':
+                renderInsights(data);
+                break;
+            case 'matches':
+                renderMatches(data.role_matches);
+                renderRoadmap(data.skill_roadmap);
+                break;
+            case 'jobs':
+                // Job Suggestions (scraped in the background; poll until ready)
+                renderJobSuggestions(data.job_suggestions);
+                if (data.job_status === 'pending' && data.job_token) {
+                    pollJobSuggestions(data.job_token);
+                }
+                break;
+        }
+    }
 
+    function renderAtsScore(score) {
         // ATS Score Animation
         const atsValue = document.getElementById('ats-score-value');
         const atsMeter = document.getElementById('ats-meter-fill');
         let currentScore = 0;
-        const targetScore = parseInt(data.ats_score) || 0;
+        const targetScore = parseInt(score) || 0;
         const duration = 1500;
         const startTime = performance.now();
 
@@ -124,43 +184,41 @@ document.addEventListener('DOMContentLoaded', () => {
             if (progress < 1) requestAnimationFrame(animateATS);
         }
         requestAnimationFrame(animateATS);
+    }
 
+    function renderSkills(skills) {
         // Detected Skills
         const skillsList = document.getElementById('skills-list');
-        data.detected_skills?.forEach(skill => {
+        skills?.forEach(skill => {
             const tag = document.createElement('span');
             tag.className = 'skill-tag';
             tag.textContent = skill;
             skillsList.appendChild(tag);
         });
+    }
 
+    function renderInsights(context) {
         // Insights
         const projectsList = document.getElementById('projects-list');
         const experienceList = document.getElementById('experience-list');
-        data.deep_intelligence?.projects?.forEach(p => {
+        context.projects?.forEach(p => {
             const li = document.createElement('li');
             li.textContent = p;
             projectsList.appendChild(li);
         });
-        data.deep_intelligence?.experience?.forEach(e => {
+        context.experience?.forEach(e => {
             const li = document.createElement('li');
             li.textContent = e;
             experienceList.appendChild(li);
         });
+    }
 
-        // Job Suggestions
-        const suggestionsList = document.getElementById('suggestions-list');
-        data.job_suggestions?.forEach(job => {
-            const link = document.createElement('a');
-            link.href = job.url;
-            link.target = '_blank';
-            link.className = 'job-link';
-            link.innerHTML = `<div><strong>${job.title}</strong><span>${job.company} • ${job.platform}</span></div><strong>Apply →</strong>`;
-            suggestionsList.appendChild(link);
-        });
+    function renderMatches(roleMatches) {
+        resultsGrid.innerHTML = '';
+        analysisTableBody.innerHTML = '';
 
         // Match Cards
-        data.role_matches?.forEach((res, index) => {
+        roleMatches?.forEach((res, index) => {
             const card = document.createElement('div');
             card.className = 'match-card animate-in';
             card.style.animationDelay = `${index * 0.1}s`;
@@ -177,11 +235,13 @@ document.addEventListener('DOMContentLoaded', () => {
             row.innerHTML = `<td>${res.role}</td><td style="color: var(--accent-blue); font-weight: 800">${Math.round(res.score * 100)}%</td><td style="font-size: 0.85rem; color: var(--text-muted)">${res.description}</td>`;
             analysisTableBody.appendChild(row);
         });
+    }
 
+    function renderRoadmap(roadmap) {
         // Roadmap
         const roadmapList = document.getElementById('skill-roadmap');
         roadmapList.innerHTML = '';
-        data.skill_roadmap?.forEach((item, index) => {
+        roadmap?.forEach((item, index) => {
             const card = document.createElement('div');
             card.className = `roadmap-card ${item.status} animate-in`;
             card.style.animationDelay = `${index * 0.1}s`;
@@ -189,12 +249,40 @@ document.addEventListener('DOMContentLoaded', () => {
             if (item.status === 'missing') card.addEventListener('click', () => openLearningModal(item.skill));
             roadmapList.appendChild(card);
         });
+    }
 
-        extractedTextPre.textContent = data.extracted_text || "No text extracted.";
-        resultsSection.classList.remove('hidden');
-        sideNav.classList.remove('hidden');
-        resultsSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
-        initScrollSpy();
+    function renderJobSuggestions(jobs) {
+        const suggestionsList = document.getElementById('suggestions-list');
+        suggestionsList.innerHTML = '';
+        jobs?.forEach(job => {
+            const link = document.createElement('a');
+            link.href = job.url;
+            link.target = '_blank';
+            link.className = 'job-link';
+            link.innerHTML = `<div><strong>${job.title}</strong><span>${job.company} • ${job.platform}</span></div><strong>Apply →</strong>`;
+            suggestionsList.appendChild(link);
+        });
+    }
+
+    let jobPollTimer = null;
+
+    function pollJobSuggestions(token, attempt = 0) {
+        clearTimeout(jobPollTimer);
+        if (attempt >= 20) return;
+        jobPollTimer = setTimeout(async () => {
+            try {
+                const response = await fetch(`/jobs/${token}`);
+                if (!response.ok) return;
+                const data = await response.json();
+                if (data.job_status === 'pending') {
+                    pollJobSuggestions(token, attempt + 1);
+                } else if (data.job_suggestions?.length) {
+                    renderJobSuggestions(data.job_suggestions);
+                }
+            } catch (error) {
+                pollJobSuggestions(token, attempt + 1);
+            }
+        }, 3000);
     }
 
     // Modal Logic
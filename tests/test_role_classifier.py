@@ -0,0 +1,48 @@
+import warnings
+
+import pytest
+
+from services import model_registry
+from services.taxonomy import get_taxonomy
+
+RESUMES = [
+    ("Backend Developer",
+     "Backend developer building REST APIs and microservices with Python, FastAPI, PostgreSQL, Redis, "
+     "Docker, Kubernetes and AWS. Wrote performance-critical modules in C++."),
+    ("Backend Developer",
+     "Software engineer. Python, Django, PostgreSQL, Redis, Go, C++. "
+     "Designed REST APIs and message queues for payment services."),
+    ("Data Scientist",
+     "Data scientist with Python, pandas, NumPy, scikit-learn, TensorFlow and SQL. "
+     "Built machine learning models, statistics and data visualization dashboards."),
+    ("Frontend Developer",
+     "Frontend developer building responsive single-page apps with React, Next.js, TypeScript, "
+     "Tailwind and Sass; JavaScript, HTML and CSS, bundled with Vite."),
+    ("Embedded Systems Engineer",
+     "Embedded firmware engineer: C, C++, microcontrollers, RTOS, Linux drivers."),
+]
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    with warnings.catch_warnings():
+        # Pickled models from another scikit-learn version warn on load
+        warnings.simplefilter("ignore")
+        predictor = model_registry.get_predictor()
+        predictor._load_models()
+    if predictor.artifacts is None or predictor.artifacts.role_classifier is None:
+        pytest.skip("no role classifier trained for the current model")
+    return predictor
+
+
+@pytest.mark.parametrize("expected, text", RESUMES)
+def test_top_role(predictor, expected, text):
+    skills = list(get_taxonomy().matcher.match(text))
+    assert predictor.rank_roles(text, skills, top_n=1)[0]["role"] == expected
+
+
+def test_implied_skills_are_not_evidence():
+    # "C" is only matched inside "C++": it adds nothing of its own
+    matcher = get_taxonomy().matcher
+    assert matcher.collapse(["C", "C++", "Python"]) == ["C++", "Python"]
+    assert matcher.collapse(["C", "React", "React.js"]) == ["C", "React", "React.js"]
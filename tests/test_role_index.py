@@ -0,0 +1,68 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from services import model_registry, role_index
+from services.role_index import RoleIndex, exact_search, synthetic_corpus
+
+K = 10
+
+
+def memory_mapped(array):
+    while array is not None and not isinstance(array, np.memmap):
+        array = array.base
+    return array is not None
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return synthetic_corpus(4000, terms=20000, queries=40, topics=100)
+
+
+def recall(approximate, reference):
+    found = sum(len(set(a.tolist()) & set(e.tolist())) for (a, _), (e, _) in zip(approximate, reference))
+    return found / sum(len(e) for e, _ in reference)
+
+
+def test_pruned_index_recall(corpus):
+    jobs, queries = corpus
+    # Few enough postings per term that pruning drops a large share of the corpus
+    index = RoleIndex(jobs, max_postings=20, candidates=100)
+    assert index.pruned.nnz < 0.6 * jobs.nnz
+
+    approximate = index.search(queries, K)
+    reference = exact_search(jobs, queries, K)
+    assert recall(approximate, reference) >= 0.9
+    # Returned scores are exact cosines, best first
+    for row, (ids, scores) in enumerate(approximate):
+        assert np.allclose(scores, (jobs[ids] @ queries[row].T).toarray().ravel())
+        assert np.all(np.diff(scores) <= 1e-12)
+
+
+def test_exported_postings_are_memory_mapped(tmp_path, monkeypatch):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    rng = np.random.default_rng(0)
+    words = [f"skill{i}" for i in range(300)]
+    texts = [" ".join(rng.choice(words, size=20)) for _ in range(400)]
+    tfidf = TfidfVectorizer().fit(texts)
+    with open(tmp_path / 'tfidf.pkl', 'wb') as f:
+        pickle.dump(tfidf, f)
+    with open(tmp_path / 'job_vectors.pkl', 'wb') as f:
+        pickle.dump(tfidf.transform(texts), f)
+    (tmp_path / 'job_roles.json').write_text('[]')
+    monkeypatch.setattr(role_index, "MIN_ROWS", 100)
+    monkeypatch.setattr(role_index, "MAX_POSTINGS", 20)
+
+    artifacts = model_registry.load_artifacts(str(tmp_path), str(tmp_path / 'job_roles.json'))
+    pruned = artifacts.index.pruned
+    assert memory_mapped(pruned.data) and memory_mapped(pruned.indices)
+    expected = role_index.prune_postings(artifacts.job_vectors, 20)
+    assert (pruned != expected).nnz == 0
+
+    queries = tfidf.transform(texts[:5])
+    built = RoleIndex(artifacts.job_vectors, max_postings=20).search(queries, K)
+    for (ids, scores), (built_ids, built_scores) in zip(artifacts.index.search(queries, K), built):
+        assert ids.tolist() == built_ids.tolist()
+        assert np.allclose(scores, built_scores)
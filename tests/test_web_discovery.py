@@ -0,0 +1,139 @@
+import threading
+import time
+import types
+
+import pytest
+
+from services import outbound, ttl_cache
+from services.intelligence_engine import IntelligenceEngine
+from services.outbound import CircuitBreaker, Provider
+from services.ttl_cache import TTLCache
+
+SKILLS = ["Python", "Docker", "Kubernetes"]
+ROLES_BODY = "Popular paths: Data Scientist, DevOps Engineer and Backend Developer roles are in demand."
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeDDGS:
+    """DDGS-compatible search client counting its calls; can block or fail."""
+
+    def __init__(self, fail=False, gate=None):
+        self.calls = 0
+        self.fail = fail
+        self.gate = gate
+        self.entered = threading.Event()
+
+    def __call__(self):
+        # Used as the engine's client factory: every thread shares this fake
+        return self
+
+    def text(self, query, max_results=5):
+        self.calls += 1
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise ConnectionError("search unavailable")
+        return [{"title": query, "body": ROLES_BODY}] * max_results
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    fake_time = types.SimpleNamespace(monotonic=clock.monotonic, sleep=time.sleep)
+    monkeypatch.setattr(ttl_cache, "time", fake_time)
+    monkeypatch.setattr(outbound, "time", fake_time)
+    return clock
+
+
+def make_engine(search, ttl=60, failures=5, reset=30):
+    engine = IntelligenceEngine(search_client=search)
+    engine.web_cache = TTLCache(max_entries=16, ttl=ttl)
+    # No rate limit on a local fake; a breaker of our own
+    engine.search_provider = Provider("fake_search", rate=1e9, burst=10 ** 9,
+                                      breaker=CircuitBreaker(failures=failures, reset=reset))
+    return engine
+
+
+def test_web_roles_are_cached_until_the_ttl_expires(clock):
+    search = FakeDDGS()
+    engine = make_engine(search, ttl=60)
+
+    assert engine.web_roles(SKILLS) == ["Data Scientist", "DevOps Engineer", "Backend Developer"]
+    clock.now += 59
+    engine.web_roles(SKILLS)
+    assert search.calls == 1
+
+    clock.now += 2
+    engine.web_roles(SKILLS)
+    assert search.calls == 2
+    assert engine.web_cache.stats()["hits"] == 1
+
+
+def test_concurrent_identical_queries_share_one_search(clock):
+    gate = threading.Event()
+    search = FakeDDGS(gate=gate)
+    engine = make_engine(search)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(engine.web_roles(SKILLS))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    assert search.entered.wait(5)
+    # Release the search only once every other caller waits on its flight
+    deadline = time.monotonic() + 5
+    while engine.web_cache.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert search.calls == 1
+    assert engine.web_cache.stats()["coalesced"] == 4
+    assert len(results) == 5 and all(roles == results[0] for roles in results)
+
+
+def test_failures_open_the_circuit_and_a_trial_call_closes_it(clock):
+    search = FakeDDGS(fail=True)
+    engine = make_engine(search, failures=2, reset=30)
+    breaker = engine.search_provider.breaker
+
+    # Failures are not cached: each call reaches the provider until the circuit opens
+    assert engine.discover_roles_via_web(SKILLS, "") == IntelligenceEngine.WEB_FALLBACK_ROLES
+    assert engine.web_roles(SKILLS) == []
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Open: calls fail fast without touching the search client
+    assert engine.web_roles(SKILLS) == []
+    assert search.calls == 2
+
+    # After the reset period one trial call goes through; a failure re-opens
+    clock.now += 31
+    assert engine.web_roles(SKILLS) == []
+    assert search.calls == 3
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # ... and a success closes the circuit again
+    clock.now += 31
+    search.fail = False
+    assert engine.web_roles(SKILLS) == ["Data Scientist", "DevOps Engineer", "Backend Developer"]
+    assert search.calls == 4
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_circuit_lets_a_single_trial_through(clock):
+    breaker = CircuitBreaker(failures=1, reset=30)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now += 31
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
@@ -2,7 +2,9 @@ import json
 import pickle
 import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
-from services.cleaner import clean_text
+from services.cleaner import clean_texts
+from services.model_registry import publish_bundle, source_version
+from services import role_classifier
 import os
 
 def train_model():
@@ -32,7 +34,7 @@ def train_model():
 
     print(f"Using '{title_col}' as title and '{desc_col}' as description.")
 
-    df['clean_text'] = df[desc_col].apply(clean_text)
+    df['clean_text'] = clean_texts(df[desc_col].tolist())
 
     tfidf = TfidfVectorizer(stop_words='english')
     tfidf_matrix = tfidf.fit_transform(df['clean_text'])
@@ -47,9 +49,51 @@ def train_model():
     with open(os.path.join(model_dir, 'job_roles.pkl'), 'wb') as f:
         pickle.dump(df[title_col].tolist(), f)
 
+    # Multi-label role classifier for offline role discovery (on these TF-IDF features)
+    classifier = role_classifier.train(zip(df[title_col], df[desc_col]), tfidf, model_version=source_version(model_dir))
+    classifier.save(os.path.join(model_dir, role_classifier.FILENAME))
+    print("Role classifier roles:", len(classifier.roles))
+
+    # Versioned bundle (with its memory-mappable arrays) that running
+    # servers hot-reload from model/current.json
+    manifest = publish_bundle(model_dir, data_path)
+    print("Published model bundle:", manifest["version"])
+
     print("✅ Training complete!")
     print("Vocabulary size:", len(tfidf.vocabulary_))
     print("Matrix shape:", tfidf_matrix.shape)
 
+def train_stream(source, append=False, workers=None, chunk_size=None):
+    """
+    Streaming alternative for large JSON Lines corpora: chunks are cleaned
+    and hashed across processes, and --append adds postings to the current
+    model without reprocessing the old ones.
+    """
+    from services import streaming_trainer
+
+    print(f"🚀 Streaming {'new postings' if append else 'training'} from {source}...")
+    model_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model')
+    summary = streaming_trainer.train_streaming(
+        source, model_dir, append=append, workers=workers,
+        chunk_size=chunk_size or streaming_trainer.CHUNK_SIZE
+    )
+    print("Published model bundle:", summary["version"])
+    print("✅ Training complete!")
+    print(f"Postings: {summary['postings']} (+{summary['added']}) for {summary['roles']} roles in {summary['seconds']}s")
+
 if __name__ == "__main__":
-    train_model()
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Train the job-role model.")
+    arg_parser.add_argument("--stream", metavar="JSONL", help="Train from a JSON Lines file of postings in chunks")
+    arg_parser.add_argument("--append", action="store_true", help="With --stream: add postings to the current streamed model")
+    arg_parser.add_argument("-w", "--workers", type=int, default=None, help="Processes cleaning/hashing chunks (default: all cores)")
+    arg_parser.add_argument("--chunk-size", type=int, default=None, help="Postings per chunk")
+    args = arg_parser.parse_args()
+
+    if args.stream:
+        train_stream(args.stream, append=args.append, workers=args.workers, chunk_size=args.chunk_size)
+    elif args.append:
+        arg_parser.error("--append requires --stream")
+    else:
+        train_model()